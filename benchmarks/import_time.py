@@ -0,0 +1,111 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Import time benchmark of the file manager modules.
+
+Each module is imported in a new interpreter, so nothing is cached by the
+previous imports. Run it with hython for the core modules, and with the
+Python of a graphical Houdini session for the UI modules:
+
+    hython benchmarks/import_time.py
+    hython benchmarks/import_time.py hou_file_manager.browser
+
+It fails if a core module imports PySide2, or if an import takes longer
+than --max-seconds.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SCRIPTS_PYTHON_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'scripts', 'python')
+
+# Modules which must be importable without PySide2.
+CORE_MODULES = [
+    'hou_file_manager.core',
+    'hou_file_manager.constants',
+    'hou_file_manager.scene_index',
+    'hou_file_manager.utils',
+    'hou_file_manager.transfer',
+]
+
+# hou is imported first, so its own import time is not counted.
+_IMPORT_CODE = '''
+import json, sys, time
+sys.path.insert(0, {path!r})
+import hou
+start = time.perf_counter()
+__import__({module!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds,
+                  'pyside2': 'PySide2' in sys.modules}}))
+'''
+
+
+def time_import(module, repeat):
+    """ Returns the best import time of the module, and if PySide2 was
+    imported."""
+
+    code = _IMPORT_CODE.format(path=SCRIPTS_PYTHON_DIR, module=module)
+
+    best = None
+    pyside2 = False
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', code])
+        result = json.loads(output.decode().strip().splitlines()[-1])
+        pyside2 = result['pyside2']
+        if best is None or result['seconds'] < best:
+            best = result['seconds']
+
+    return best, pyside2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('modules', nargs='*', default=CORE_MODULES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=0.5)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        seconds, pyside2 = time_import(module, args.repeat)
+
+        errors = []
+        if pyside2 and module in CORE_MODULES:
+            errors.append('imports PySide2')
+        if seconds > args.max_seconds:
+            errors.append('slower than {}s'.format(args.max_seconds))
+
+        print('{:<40} {:8.1f} ms  {}'.format(module, seconds * 1000,
+                                             ', '.join(errors) or 'ok'))
+        failed = failed or bool(errors)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
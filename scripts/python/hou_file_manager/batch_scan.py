@@ -0,0 +1,341 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Scan many .hip files for their file references, in a pool of hython
+worker processes:
+
+    python -m hou_file_manager.batch_scan /show/shots -o report.jsonl
+
+Every worker loads the .hip files it is given one after the other, so
+hython starts only once per worker. The report is a JSON-lines file with a
+'file_ref' record per file reference, including the files of sequences and
+tiles and if they exist, and a 'hip' record per .hip file. The records of
+a .hip file are written when the worker is done with it. If the worker
+dies, hangs for longer than the timeout or sends a malformed record, the
+records received so far are written with 'partial' set, followed by an
+error 'hip' record, and the worker is replaced.
+
+This module doesn't import hou, so it can run with any Python 3.
+"""
+
+import argparse
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from . import constants as const
+
+
+def add_filter_args(parser):
+    """ Add the arguments of the node and parm filters to the parser."""
+
+    parser.add_argument('--root', default=const.PATH_DELIMITER,
+                        help='Root node of the search.')
+    parser.add_argument('--node-name', default='*',
+                        help='Node name pattern.')
+    parser.add_argument('--node-type', default='*',
+                        help='Node type pattern.')
+    parser.add_argument('--parm-name', default='*',
+                        help='Parameter name or label pattern.')
+    parser.add_argument('--file-type', default='*',
+                        help='Parameter file type, image, geometry or * for '
+                             'all file references.')
+    parser.add_argument('--match-invisible', action='store_true',
+                        help='Also match the invisible parameters.')
+
+
+def find_hip_files(paths):
+    """ Returns the .hip files of the paths, searching directories."""
+
+    hip_files = []
+    for path in paths:
+        if os.path.isfile(path):
+            hip_files.append(os.path.abspath(path))
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(path):
+            # Skip the backup directories of Houdini.
+            dirnames[:] = sorted(d for d in dirnames if d != 'backup')
+            for filename in sorted(filenames):
+                if filename.lower().endswith(
+                        const.BATCH_SCAN_HIP_EXTENSIONS):
+                    hip_files.append(
+                        os.path.abspath(os.path.join(dirpath, filename)))
+
+    return hip_files
+
+
+def default_hython():
+    hfs = os.environ.get('HFS')
+    if hfs:
+        for name in ('hython', 'hython.exe'):
+            path = os.path.join(hfs, 'bin', name)
+            if os.path.isfile(path):
+                return path
+
+    return 'hython'
+
+
+class _Worker:
+    """
+    A hython worker process. Its output is read by a thread into a queue,
+    so the records can be waited for with a timeout.
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.lines = queue.Queue()
+
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        try:
+            for line in self.process.stdout:
+                self.lines.put(line)
+        finally:
+            # End of the output.
+            self.lines.put(None)
+
+    def kill(self):
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+        self.process.wait()
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+
+class BatchScanner:
+    """
+    Feeds the .hip files to a pool of hython workers, one file at a time per
+    worker, and writes their records to the output. A worker which dies,
+    e.g. on a crash while loading a file, or takes longer than timeout
+    seconds for a file, is replaced, and an error record is written for that
+    file.
+    """
+
+    def __init__(self, hip_files, output, workers=None, hython=None,
+                 filter_args=(), timeout=const.BATCH_SCAN_TIMEOUT):
+        self.output = output
+        self.workers = max(1, min(workers or os.cpu_count() or 1,
+                                  len(hip_files) or 1))
+        self.hython = hython or default_hython()
+        self.filter_args = list(filter_args)
+        self.timeout = timeout
+
+        self._hip_queue = queue.Queue()
+        for hip_file in hip_files:
+            self._hip_queue.put(hip_file)
+
+        self._lock = threading.Lock()
+        self.hip_count = 0
+        self.file_ref_count = 0
+        self.missing_count = 0
+        self.error_count = 0
+
+    def _start_worker(self):
+        # The package must be importable by the worker.
+        package_dir = os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            p for p in (package_dir, env.get('PYTHONPATH')) if p)
+
+        return _Worker(subprocess.Popen(
+            [self.hython, '-m', const.BATCH_SCAN_WORKER_MODULE] +
+            self.filter_args,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env,
+            universal_newlines=True, bufsize=1))
+
+    def _write(self, records):
+        with self._lock:
+            for record in records:
+                if record['type'] == 'hip':
+                    self.hip_count += 1
+                    if record['status'] != 'ok':
+                        self.error_count += 1
+                else:
+                    self.file_ref_count += 1
+                    if not record['exists']:
+                        self.missing_count += 1
+
+                self.output.write(json.dumps(record) + '\n')
+
+            self.output.flush()
+
+    def _scan_hip_file(self, worker, hip_file):
+        """
+        Returns the records of the .hip file, and an error message if the
+        worker has to be replaced.
+        """
+
+        records = []
+        try:
+            worker.process.stdin.write(hip_file + '\n')
+            worker.process.stdin.flush()
+        except OSError:
+            return records, 'The worker exited.'
+
+        deadline = None
+        if self.timeout:
+            deadline = time.monotonic() + self.timeout
+
+        prefix = const.BATCH_SCAN_RECORD_PREFIX
+        while True:
+            try:
+                line = worker.lines.get(
+                    timeout=None if deadline is None
+                    else max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                return records, 'Timed out after {:g}s.'.format(self.timeout)
+
+            if line is None:
+                return records, 'The worker exited.'
+
+            if not line.startswith(prefix):
+                # What Houdini prints.
+                sys.stderr.write(line)
+                continue
+
+            try:
+                record = json.loads(line[len(prefix):])
+            except ValueError:
+                return records, 'Malformed record from the worker: {!r}' \
+                    .format(line.rstrip()[:200])
+
+            records.append(record)
+            if record['type'] == 'hip' and record['hip'] == hip_file:
+                return records, None
+
+    def _run_worker(self):
+        worker = None
+        try:
+            while True:
+                try:
+                    hip_file = self._hip_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if worker is None:
+                    worker = self._start_worker()
+
+                records, error = self._scan_hip_file(worker, hip_file)
+                if error is None:
+                    self._write(records)
+                    continue
+
+                worker.kill()
+                if worker.process.returncode and \
+                        error == 'The worker exited.':
+                    error = 'The worker exited with code {}.' \
+                        .format(worker.process.returncode)
+                worker = None
+
+                # What was found before the worker failed.
+                for record in records:
+                    record['partial'] = True
+                missing = sum(1 for r in records if not r.get('exists'))
+                records.append({'type': 'hip', 'hip': hip_file,
+                                'status': 'error', 'partial': True,
+                                'file_refs': len(records),
+                                'missing': missing, 'error': error})
+                self._write(records)
+        finally:
+            if worker is not None:
+                worker.close()
+
+    def run(self):
+        threads = [threading.Thread(target=self._run_worker, daemon=True)
+                   for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def summary(self):
+        return ('{} .hip file(s), {} file reference(s), {} missing, '
+                '{} error(s)'.format(self.hip_count, self.file_ref_count,
+                                     self.missing_count, self.error_count))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Scan .hip files for their file references.')
+    parser.add_argument('paths', nargs='+',
+                        help='.hip files, or directories to search.')
+    parser.add_argument('-o', '--output',
+                        help='The JSON-lines report, stdout by default.')
+    parser.add_argument('-j', '--workers', type=int,
+                        help='Number of hython workers, all the cores by '
+                             'default.')
+    parser.add_argument('--hython', help='The hython executable.')
+    parser.add_argument('--timeout', type=float,
+                        default=const.BATCH_SCAN_TIMEOUT,
+                        help='Seconds a worker may spend on a .hip file '
+                             'before it is killed, 0 for no limit.')
+    add_filter_args(parser)
+    args = parser.parse_args(argv)
+
+    filter_args = ['--root', args.root, '--node-name', args.node_name,
+                   '--node-type', args.node_type,
+                   '--parm-name', args.parm_name,
+                   '--file-type', args.file_type]
+    if args.match_invisible:
+        filter_args.append('--match-invisible')
+
+    hython = args.hython or default_hython()
+    if not shutil.which(hython):
+        parser.error('hython is not found: {}. Use --hython or set $HFS.'
+                     .format(hython))
+
+    hip_files = find_hip_files(args.paths)
+    start = time.perf_counter()
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        scanner = BatchScanner(hip_files, output, args.workers, hython,
+                               filter_args, args.timeout)
+        scanner.run()
+    finally:
+        if args.output:
+            output.close()
+
+    sys.stderr.write('{} in {:.1f}s.\n'.format(scanner.summary(),
+                                              time.perf_counter() - start))
+    return 1 if scanner.error_count else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+The hython worker of batch_scan. It reads .hip file paths from stdin, one
+per line, and writes a JSON record per file reference, then a 'hip' record
+when the .hip file is done. The records are prefixed with
+const.BATCH_SCAN_RECORD_PREFIX, so they are not mixed up with what Houdini
+prints.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import hou
+
+from . import constants as const
+from . import matchers
+from . import utils
+from .batch_scan import add_filter_args
+from .scene_index import make_node_entry
+
+
+def emit(record):
+    sys.stdout.write(const.BATCH_SCAN_RECORD_PREFIX + json.dumps(record) +
+                     '\n')
+    sys.stdout.flush()
+
+
+def resolve_file_reference(parm):
+    """
+    Returns a dict of the resolved files of a file parm: the kind of the
+    reference (file, sequence or tiles), the files and if they exist.
+    """
+
+    raw_value = parm.rawValue()
+    value = parm.eval()
+    record = {'raw_value': raw_value, 'value': value, 'kind': 'file',
+              'files': [], 'exists': False}
+
+    tile_set = utils.get_parm_file_tiles(parm)
+    sequence = None
+    if tile_set is None and parm.isTimeDependent():
+        sequence = utils.get_parm_file_sequence(parm)
+
+    if tile_set is not None:
+        record['kind'] = 'tiles'
+        record['files'] = tile_set.file_paths()
+        record['udims'] = tile_set.udims()
+        record['describe'] = tile_set.describe()
+
+    elif sequence is not None:
+        record['kind'] = 'sequence'
+        record['files'] = sequence.file_paths()
+        record['frame_range'] = sequence.frame_range()
+        record['missing_frames'] = sequence.missing_frames()
+        record['describe'] = sequence.describe()
+
+    elif value:
+        # Tile tokens in the directory part are globbed.
+        record['files'] = utils.get_parm_source_files(parm) or [value]
+
+    # Sequences and tiles are found in the directory listings.
+    if record['kind'] == 'file':
+        record['exists'] = bool(record['files']) and \
+            all(os.path.isfile(f) for f in record['files'])
+    else:
+        record['exists'] = bool(record['files'])
+
+    return record
+
+
+def scan_hip_file(hip_file, args):
+    """ Load the .hip file and emit the records of its file references."""
+
+    start = time.perf_counter()
+    hip_record = {'type': 'hip', 'hip': hip_file, 'status': 'ok',
+                  'file_refs': 0, 'missing': 0}
+
+    try:
+        hou.hipFile.load(hip_file, suppress_save_prompt=True,
+                         ignore_load_warnings=True)
+
+        root_node = hou.node(args.root)
+        if not root_node:
+            raise ValueError('The root node does not exist: {}'
+                             .format(args.root))
+
+        # The same matching as the browser.
+        pipeline = matchers.node_entry_pipeline(
+            args.node_name, args.node_type, args.parm_name,
+            args.file_type.lower(), args.match_invisible)
+
+        for node in root_node.allSubChildren(recurse_in_locked_nodes=False):
+            entry = make_node_entry(node)
+            if not entry or not pipeline.matches(entry):
+                continue
+
+            for file_parm in entry.match_file_parms(
+                    args.parm_name, args.file_type.lower(),
+                    args.match_invisible):
+                record = {'type': 'file_ref', 'hip': hip_file,
+                          'node': entry.path, 'node_type': entry.type_name,
+                          'parm': file_parm.parm_name,
+                          'file_type': file_parm.file_type}
+                record.update(resolve_file_reference(
+                    node.parm(file_parm.parm_name)))
+                emit(record)
+
+                hip_record['file_refs'] += 1
+                if not record['exists']:
+                    hip_record['missing'] += 1
+
+    except Exception as e:
+        hip_record['status'] = 'error'
+        hip_record['error'] = '{}: {}'.format(type(e).__name__, e)
+
+    finally:
+        hou.hipFile.clear(suppress_save_prompt=True)
+
+    hip_record['seconds'] = time.perf_counter() - start
+    emit(hip_record)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch scan worker.')
+    add_filter_args(parser)
+    args = parser.parse_args()
+
+    for line in sys.stdin:
+        hip_file = line.strip()
+        if hip_file:
+            scan_hip_file(hip_file, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,16 +22,16 @@
 
 import os
 import subprocess
-from functools import partial
 
 from PySide2.QtWidgets import QWidget, QFrame, QGroupBox
 from PySide2.QtWidgets import (QAbstractItemView, QListView, QTreeView,
                                QHeaderView)
 from PySide2.QtWidgets import (QPushButton, QLineEdit, QLabel,
-                               QRadioButton, QCheckBox)
+                               QRadioButton, QCheckBox, QSpinBox)
 from PySide2.QtWidgets import QVBoxLayout, QHBoxLayout, QScrollArea
 from PySide2.QtWidgets import QTabWidget, QSplitter, QButtonGroup
-from PySide2.QtWidgets import QSizePolicy
+from PySide2.QtWidgets import QSizePolicy, QProgressDialog, QApplication
+from PySide2.QtWidgets import QProgressBar
 from PySide2.QtCore import QModelIndex
 from PySide2.QtCore import Qt
 
@@ -40,9 +40,14 @@ import nodesearch
 import resourceui
 
 from . import constants as const
+from . import core
 from . import matchers
-from . import utils
+from .file_status import STAT_CACHE
+from .scene_index import SCENE_INDEX, make_node_entry
+from .scene_watcher import SCENE_WATCHER
 from .hou_tree_model import HouParmTreeModel, HouNodeTreeModel
+from .delegates import ToolsItemDelegate
+from .scheduler import DebouncedScheduler, TimeSlicedTask
 
 
 class NodeParmFilterList(QWidget):
@@ -83,6 +88,20 @@ class FilePathManagerBrowser(QFrame):
         self._node_tree_model = None
         self._parm_tree_model = None
 
+        # The scan of the scene, when the index is built, and the matcher
+        # pipeline and root path of the matches it adds to the node view.
+        self._scan_task = None
+        self._scan_pipeline = None
+        self._scan_root_prefix = None
+        # Set when the user cancels the scan, so it is not started again
+        # before Refresh is pressed.
+        self._scan_cancelled = False
+
+        # Filter changes, like typing a node type pattern, are coalesced
+        # into one refresh.
+        self._refresh_scheduler = DebouncedScheduler(
+            self.on_refresh, const.REFRESH_DEBOUNCE_MS, self)
+
         # --------------- top section ---------------
         top_section_layout = self.build_top_section()
 
@@ -97,20 +116,79 @@ class FilePathManagerBrowser(QFrame):
         # set the root layout
         self.setLayout(root_layout)
 
+        # Bursts of scene changes, like deleting a sub-tree, are coalesced
+        # into one refresh.
+        self._scene_change_scheduler = DebouncedScheduler(
+            self.on_scene_changes_settled, const.SCENE_CHANGE_DEBOUNCE_MS,
+            self)
+        SCENE_WATCHER.add_listener(self.on_scene_changed)
+
     def set_up_node_tree_model(self, path_list):
 
-        self._node_tree_model = HouNodeTreeModel(path_list)
+        # Expand all the levels, unless there are too many nodes, or the
+        # number of nodes is not known yet during a scan.
+        expand_levels = self.ui_node_expand_levels_spin.value()
+        lazy = (expand_levels > 0 or
+                len(path_list) > const.NODE_TREE_LAZY_THRESHOLD or
+                SCENE_INDEX.is_building())
+
+        # Update the existing model with only the differences, so the
+        # selection, scroll position and expansion states are kept.
+        if self._node_tree_model and path_list and \
+                self._node_tree_model.is_lazy() == lazy:
+            self.expand_node_tree_ancestors(
+                self._node_tree_model.set_paths(path_list))
+            return
+
+        self._node_tree_model = HouNodeTreeModel(path_list, lazy=lazy)
         self.ui_node_tree_view.setModel(self._node_tree_model)
         self.ui_node_tree_view.selectionModel().selectionChanged.connect(
             self.on_node_tree_view_selection_changed)
 
         # Configure tree view
-        self.ui_node_tree_view.expandAll()
+        if lazy:
+            self.expand_node_tree_levels(
+                expand_levels or const.NODE_TREE_AUTO_EXPAND_LEVELS)
+        else:
+            self.ui_node_tree_view.expandAll()
         self.ui_node_tree_view.resizeColumnToContents(0)
 
+    def expand_node_tree_ancestors(self, indexes):
+        """ Expand the ancestors of the node view indexes."""
+
+        for index in indexes:
+            parent = index.parent()
+            while parent.isValid():
+                self.ui_node_tree_view.expand(parent)
+                parent = parent.parent()
+
+    def expand_node_tree_levels(self, levels):
+        """ Expand the first levels of the node tree, fetching the items."""
+
+        model = self._node_tree_model
+        indexes = [QModelIndex()]
+        for _ in range(levels):
+            child_indexes = []
+            for index in indexes:
+                if model.canFetchMore(index):
+                    model.fetchMore(index)
+
+                for row in range(model.rowCount(index)):
+                    child_index = model.index(row, 0, index)
+                    if model.hasChildren(child_index):
+                        child_indexes.append(child_index)
+
+            for index in child_indexes:
+                self.ui_node_tree_view.expand(index)
+
+            indexes = child_indexes
+
     def set_up_parm_tree_model(self, parm_list):
 
         # Update the parm tree view
+        if self._parm_tree_model:
+            self._parm_tree_model.remove_callbacks()
+
         self._parm_tree_model = HouParmTreeModel(parm_list)
         self.ui_parm_tree_view.setModel(self._parm_tree_model)
         self._parm_tree_model.dataChanged.connect(
@@ -120,51 +198,24 @@ class FilePathManagerBrowser(QFrame):
 
         # Configure tree view
         self.ui_parm_tree_view.resizeColumnToContents(0)
-        self.ui_parm_tree_view.setColumnWidth(1, 50)
+        self.ui_parm_tree_view.setColumnWidth(
+            const.PARM_TREE_VIEW_TOOLS_COLUMN, 50)
+        # The Status column takes the rest of the width.
+        self.ui_parm_tree_view.resizeColumnToContents(
+            const.PARM_TREE_VIEW_EDITABLE_COLUMN)
         header = self.ui_parm_tree_view.header()
         header.setSectionResizeMode(0, QHeaderView.Interactive)
-        header.setSectionResizeMode(1, QHeaderView.Fixed)
+        header.setSectionResizeMode(const.PARM_TREE_VIEW_TOOLS_COLUMN,
+                                    QHeaderView.Fixed)
         header.setSectionsMovable(False)
 
-        # Add file chooser button to all column 1 items.
-        parm_root_index = self.ui_parm_tree_view.rootIndex()
-        parm_row_count = self._parm_tree_model.rowCount(parm_root_index)
-        for row in range(parm_row_count):
-            # multiple buttons
-            buttons_widget = QWidget()
-            buttons_layout = QHBoxLayout()
-            buttons_layout.setContentsMargins(0, 0, 0, 0)
-            file_chooser_button = hou.qt.FileChooserButton()
-            # get orig data
-            index = self._parm_tree_model.index(row, 0)
-            parm = (self._parm_tree_model.get_item(index)
-                    .get_raw_data().get_orig_data())
-            if matchers.parm_is_file_type(parm, 'image'):
-                file_chooser_button.setFileChooserFilter(hou.fileType.Image)
-                file_chooser_button.setFileChooserIsImageChooser(True)
-            elif matchers.parm_is_file_type(parm, 'geometry'):
-                file_chooser_button.setFileChooserFilter(hou.fileType.Geometry)
-            preview_button = QPushButton('P')
-            buttons_layout.addWidget(file_chooser_button)
-            buttons_layout.addWidget(preview_button)
-            buttons_widget.setLayout(buttons_layout)
-
-            # add the widget to the item
-            self.ui_parm_tree_view.setIndexWidget(
-                self._parm_tree_model.index(row,1), buttons_widget)
-
-            # add callbacks
-            file_cb = partial(self.update_parm_model, row)
-            file_chooser_button.fileSelected.connect(file_cb)
-
-            preview_cb = partial(self.on_preview_file, row)
-            preview_button.clicked.connect(preview_cb)
-
     def build_top_section(self):
 
         # create widgets
         self.ui_refresh_button = QPushButton('Refresh')
-        self.ui_refresh_button.clicked.connect(self.on_refresh)
+        self.ui_refresh_button.setToolTip(
+            'Re-scan the whole scene for file parameters.')
+        self.ui_refresh_button.clicked.connect(self.on_rescan)
 
         # choose root node section
         root_path_layout = QHBoxLayout()
@@ -215,7 +266,8 @@ class FilePathManagerBrowser(QFrame):
         self.ui_node_type_combo.setEditable(True)
         self.ui_node_type_combo.addItem('*')
         self.ui_node_type_combo.setMinimumWidth(200)
-        self.ui_node_type_combo.currentTextChanged.connect(self.on_refresh)
+        self.ui_node_type_combo.currentTextChanged.connect(
+            self._refresh_scheduler.request)
         node_type_filter_layout.addWidget(node_type_label)
         node_type_filter_layout.addWidget(self.ui_node_type_category_combo)
         node_type_filter_layout.addWidget(self.ui_node_type_combo, stretch=1)
@@ -245,7 +297,8 @@ class FilePathManagerBrowser(QFrame):
         self.ui_file_type_combo = hou.qt.ComboBox()
         self.ui_file_type_combo.addItem('Image')
         self.ui_file_type_combo.addItem('Geometry')
-        self.ui_file_type_combo.currentTextChanged.connect(self.on_refresh)
+        self.ui_file_type_combo.currentTextChanged.connect(
+            self._refresh_scheduler.request)
         parm_file_type_filter_layout.addWidget(self.ui_file_type_combo)
         parm_file_type_filter_layout.addStretch()
 
@@ -271,7 +324,7 @@ class FilePathManagerBrowser(QFrame):
     def build_node_view_widget(self):
         # Top widget and layout
         node_view_top_widget = QWidget()
-        node_view_layout = QHBoxLayout()
+        node_view_layout = QVBoxLayout()
 
         # The tree view
         self.ui_node_tree_view = QTreeView()
@@ -293,7 +346,42 @@ class FilePathManagerBrowser(QFrame):
         self.ui_node_tree_view.doubleClicked.connect(
             self.on_node_tree_view_double_clicked)
 
+        # Expand levels, 0 for all the levels.
+        expand_levels_layout = QHBoxLayout()
+        expand_levels_label = QLabel('Expand levels:')
+        self.ui_node_expand_levels_spin = QSpinBox()
+        self.ui_node_expand_levels_spin.setRange(
+            0, const.NODE_TREE_MAX_EXPAND_LEVELS)
+        self.ui_node_expand_levels_spin.setSpecialValueText('All')
+        self.ui_node_expand_levels_spin.setToolTip(
+            'Number of levels of the node view to expand.\n'
+            'The other levels are populated when they are expanded.\n'
+            'With "All", only the first {} levels are expanded when there\n'
+            'are more than {} matched nodes.'
+            .format(const.NODE_TREE_AUTO_EXPAND_LEVELS,
+                    const.NODE_TREE_LAZY_THRESHOLD))
+        self.ui_node_expand_levels_spin.valueChanged.connect(
+            self.on_node_expand_levels_changed)
+        expand_levels_layout.addWidget(expand_levels_label)
+        expand_levels_layout.addWidget(self.ui_node_expand_levels_spin)
+        expand_levels_layout.addStretch()
+
+        # Progress of the scan of the scene, only shown while scanning.
+        self.ui_scan_progress_widget = QWidget()
+        scan_progress_layout = QHBoxLayout()
+        scan_progress_layout.setContentsMargins(0, 0, 0, 0)
+        self.ui_scan_progress_bar = QProgressBar()
+        self.ui_scan_progress_bar.setFormat('Scanning %v / %m nodes')
+        scan_cancel_button = QPushButton('Cancel')
+        scan_cancel_button.clicked.connect(self.on_scan_cancel)
+        scan_progress_layout.addWidget(self.ui_scan_progress_bar)
+        scan_progress_layout.addWidget(scan_cancel_button)
+        self.ui_scan_progress_widget.setLayout(scan_progress_layout)
+        self.ui_scan_progress_widget.hide()
+
         # Add tree view
+        node_view_layout.addLayout(expand_levels_layout)
+        node_view_layout.addWidget(self.ui_scan_progress_widget)
         node_view_layout.addWidget(self.ui_node_tree_view)
         node_view_top_widget.setLayout(node_view_layout)
 
@@ -321,6 +409,13 @@ class FilePathManagerBrowser(QFrame):
             '* Double-click on an item of the "Raw Value" column to \n'
             '  edit them directly in place.')
 
+        # The buttons of the Tools column are painted by a delegate.
+        self._tools_delegate = ToolsItemDelegate(self.ui_parm_tree_view)
+        self._tools_delegate.browse_clicked.connect(self.on_browse_file)
+        self._tools_delegate.preview_clicked.connect(self.on_preview_file)
+        self.ui_parm_tree_view.setItemDelegateForColumn(
+            const.PARM_TREE_VIEW_TOOLS_COLUMN, self._tools_delegate)
+
         # Add to layout
         parm_view_layout.addWidget(self.ui_parm_tree_view)
         parm_view_top_widget.setLayout(parm_view_layout)
@@ -347,6 +442,7 @@ class FilePathManagerBrowser(QFrame):
         self.ui_batch_process_action_combo.addItem('Copy')
         self.ui_batch_process_action_combo.addItem('Move')
         self.ui_batch_process_action_combo.addItem('Repath')
+        self.ui_batch_process_action_combo.addItem('Link')
         selection_option_button_grp = QButtonGroup()
         self.ui_selected_parms_option = QRadioButton(
             'file(s) of selected parm(s)')
@@ -363,16 +459,25 @@ class FilePathManagerBrowser(QFrame):
         dest_dir_browse.setFileChooserTitle('Choose destination directory')
         dest_dir_browse.fileSelected.connect(self.on_dest_dir_browse)
         hlayout.addWidget(dest_dir_browse)
+        workers_layout = QHBoxLayout()
+        workers_label = QLabel('Parallel file transfers:')
+        self.ui_transfer_workers_spin = QSpinBox()
+        self.ui_transfer_workers_spin.setRange(1, const.MAX_TRANSFER_WORKERS)
+        self.ui_transfer_workers_spin.setValue(const.DEFAULT_TRANSFER_WORKERS)
+        workers_layout.addWidget(workers_label)
+        workers_layout.addWidget(self.ui_transfer_workers_spin)
+        workers_layout.addStretch()
         run_it = QPushButton('Run')
         run_it.clicked.connect(self.on_action_run_it)
         note_label = QLabel(
-            'NOTE: <UDIM> or $F (or ${F}) styles\n'
+            'NOTE: <UDIM>, <UVTILE> or $F (or ${F}) styles\n'
             'of sequence file paths are supported.')
         parm_layout_grp_box_mlt.addWidget(self.ui_batch_process_action_combo)
         parm_layout_grp_box_mlt.addWidget(self.ui_selected_parms_option)
         parm_layout_grp_box_mlt.addWidget(self.ui_all_parms_option)
         parm_layout_grp_box_mlt.addWidget(label)
         parm_layout_grp_box_mlt.addLayout(hlayout)
+        parm_layout_grp_box_mlt.addLayout(workers_layout)
         parm_layout_grp_box_mlt.addWidget(run_it)
         parm_layout_grp_box_mlt.addWidget(note_label)
         self.ui_grp_box_multi.setLayout(parm_layout_grp_box_mlt)
@@ -422,56 +527,176 @@ class FilePathManagerBrowser(QFrame):
         self.ui_root_path_text.setText('')
         self.on_refresh()
 
+    def on_rescan(self):
+        """ Re-scan the whole scene and refresh the UIs."""
+        self.cancel_scan()
+        self._scan_cancelled = False
+        matchers.PARM_FILE_TYPE_CACHE.clear()
+        SCENE_INDEX.invalidate()
+        # The files may have changed on disk as well.
+        STAT_CACHE.clear()
+        self.on_refresh()
+
+    def on_hip_file_changed(self):
+        self.cancel_scan()
+        self._scan_cancelled = False
+        matchers.PARM_FILE_TYPE_CACHE.clear()
+        SCENE_INDEX.invalidate()
+        self.on_reset()
+
+    def on_destroy(self):
+        """ Remove the callbacks when the panel is closed."""
+
+        self.cancel_scan()
+        self._scene_change_scheduler.cancel()
+        self._refresh_scheduler.cancel()
+        SCENE_WATCHER.remove_listener(self.on_scene_changed)
+
+        # Building a new empty model would add its listener again.
+        if self._parm_tree_model:
+            self._parm_tree_model.remove_callbacks()
+            self._parm_tree_model = None
+            self.ui_parm_tree_view.setModel(None)
+
+        # The index is shared, only the last panel removes its callbacks.
+        if not SCENE_WATCHER.has_listeners():
+            SCENE_INDEX.invalidate()
+
+    def on_scene_changed(self, event_type, **kwargs):
+        self._scene_change_scheduler.request()
+
+    def on_scene_changes_settled(self):
+        # No root node, so there is nothing to update.
+        if not self.ui_root_path_text.text():
+            return
+
+        # The index re-scans the changed parts, and the node view only
+        # inserts and removes the rows which differ.
+        self.on_refresh()
+
     def on_refresh(self):
         """ The main callback for refreshing the UIs."""
 
+        # A pending refresh would be the same.
+        self._refresh_scheduler.cancel()
+
         # Get the root node
         root_path = self.ui_root_path_text.text()
-        if not root_path:
-            self.set_up_node_tree_model([])
-            self.set_up_parm_tree_model([])
-            return
-
-        root_node = hou.node(root_path)
+        root_node = hou.node(root_path) if root_path else None
         if not root_node:
+            self._scan_pipeline = None
             self.set_up_node_tree_model([])
             self.set_up_parm_tree_model([])
             return
 
         # Get the filters
-        filter_matchers = []
         node_name_filter_txt = self.ui_node_name_filter_text.text()
         if not node_name_filter_txt:
             node_name_filter_txt = '*'
-        filter_matchers.append(nodesearch.Name(node_name_filter_txt))
 
         node_type_filter_txt = self.ui_node_type_combo.lineEdit().text()
-        filter_matchers.append(nodesearch.NodeType(node_type_filter_txt))
+        if not node_type_filter_txt:
+            node_type_filter_txt = '*'
 
         parm_name_filter_txt = self.ui_parm_name_filter_text.text()
         if not parm_name_filter_txt:
             parm_name_filter_txt = '*'
         parm_file_type_filter_txt = self.ui_file_type_combo.currentText()
-        filter_matchers.append(matchers.ParmNameAndFileType(
-            parm_name_filter_txt, parm_file_type_filter_txt))
 
-        final_matcher_grp = nodesearch.Group(filter_matchers, intersect=True)
+        # The scene is scanned in slices to build the index, and the
+        # matches are added to the node view as they are found. A change of
+        # the filters only changes the matches of the running scan.
+        if not SCENE_INDEX.is_built() and not SCENE_INDEX.is_building():
+            # Until Refresh is pressed, the node view keeps the matches
+            # found before the scan was cancelled.
+            if self._scan_cancelled:
+                return
+            self.start_scan()
+
+        self._scan_pipeline = matchers.node_entry_pipeline(
+            node_name_filter_txt, node_type_filter_txt, parm_name_filter_txt,
+            parm_file_type_filter_txt.lower())
+        self._scan_root_prefix = (root_node.path().rstrip(const.PATH_DELIMITER)
+                                  + const.PATH_DELIMITER)
+
+        # Query the scene index instead of searching the scene, which only
+        # has the nodes scanned so far during a scan.
+        path_list = SCENE_INDEX.query(root_node.path(), node_name_filter_txt,
+                                      node_type_filter_txt,
+                                      parm_name_filter_txt,
+                                      parm_file_type_filter_txt)
+
+        # Update the node model, and the parm model from the nodes still
+        # selected, as the parm filters may have changed.
+        self.set_up_node_tree_model(path_list)
+        self.on_node_tree_view_selection_changed(None, None)
 
-        nodes = list(final_matcher_grp.nodes(root_node, ignore_case=True,
-                                             recursive=True,
-                                             recurse_in_locked_nodes=False))
+    def start_scan(self):
+        self._scan_task = TimeSlicedTask(SCENE_INDEX.build_iter(),
+                                         self.on_scan_slice,
+                                         self.on_scan_finished, parent=self)
+        self.ui_scan_progress_bar.setRange(0, 0)
+        self.ui_scan_progress_widget.show()
+        self._scan_task.start()
 
-        # Get node path list
-        path_list = [n.path() for n in nodes]
+    def cancel_scan(self):
+        """ Stop the scan. The index is partial, so it is dropped."""
 
-        # Set up the two models.
-        self.set_up_node_tree_model(path_list)
-        self.set_up_parm_tree_model([])
+        if not self._scan_task:
+            return
+
+        self._scan_task.cancel()
+        self._scan_task = None
+        self.ui_scan_progress_widget.hide()
+        SCENE_INDEX.invalidate()
+
+    def on_scan_cancel(self):
+        # The node view keeps the matches found so far.
+        self.cancel_scan()
+        self._scan_cancelled = True
+        print('The scan of the scene was cancelled, press Refresh to '
+              'scan it again.')
+
+    def on_scan_slice(self, items):
+        if not items:
+            return
+
+        done, total, _ = items[-1]
+        self.ui_scan_progress_bar.setRange(0, total)
+        self.ui_scan_progress_bar.setValue(done)
+
+        if not self._node_tree_model or not self._scan_pipeline:
+            return
+
+        path_list = [entry.path for _, _, entry in items
+                     if entry and entry.path.startswith(self._scan_root_prefix)
+                     and self._scan_pipeline.matches(entry)]
+        if path_list:
+            self.expand_node_tree_ancestors(
+                self._node_tree_model.add_paths(path_list))
+
+    def on_scan_finished(self):
+        self._scan_task = None
+        self.ui_scan_progress_widget.hide()
+
+        # The index is complete now, and has the changes made during the
+        # scan.
+        self.on_refresh()
 
     def on_root_node_selected(self, op_node):
         self.ui_root_path_text.setText(op_node.path())
         self.on_refresh()
 
+    def on_node_expand_levels_changed(self, value):
+        if not self._node_tree_model:
+            return
+
+        # Rebuild the node view with the same nodes.
+        path_list = sorted(self._node_tree_model.leaf_paths())
+        self._node_tree_model = None
+        self.set_up_node_tree_model(path_list)
+        self.on_node_tree_view_selection_changed(None, None)
+
     def on_node_tree_view_double_clicked(self, model_index: QModelIndex):
 
         node = self._node_tree_model.get_hou_object(model_index)
@@ -481,6 +706,62 @@ class FilePathManagerBrowser(QFrame):
         node.setCurrent(True, clear_all_selected=True)
 
     def on_node_tree_view_selection_changed(self, selected, deselected):
+        if not self._parm_tree_model:
+            self.set_up_parm_tree_model([])
+
+        # The file parms of the nodes are found in the scene index. An index
+        # which is not built, e.g. after a cancelled scan, is not built here,
+        # as it would freeze the UI.
+        if SCENE_INDEX.is_built():
+            SCENE_INDEX.update()
+
+        if selected is None or deselected is None:
+            # The filters may have changed, so check all the selected nodes.
+            # Use selectedRows(0) because we just need one id per row.
+            id_list = self.ui_node_tree_view.selectionModel().selectedRows(0)
+            self._parm_tree_model.set_node_parms(
+                [(path, self.get_node_file_parms(path))
+                 for path in self.get_node_paths(id_list)])
+        else:
+            # Only the nodes which left or entered the selection.
+            for path in self.get_node_paths(deselected.indexes()):
+                self._parm_tree_model.remove_node_parms(path)
+
+            for path in self.get_node_paths(selected.indexes()):
+                self._parm_tree_model.add_node_parms(
+                    path, self.get_node_file_parms(path))
+
+        self.node_tree_view_config_post_model_setup()
+
+    def get_node_paths(self, indexes):
+        """ Returns the node paths of the node view indexes, in order."""
+
+        node_paths = []
+        seen = set()
+        for index in indexes:
+            if index.column() != 0:
+                continue
+
+            path = self._node_tree_model.item_path(
+                self._node_tree_model.get_item(index))
+            if path not in seen:
+                seen.add(path)
+                node_paths.append(path)
+
+        return node_paths
+
+    def get_node_file_parms(self, node_path):
+        """ Returns the indexed file parms of the node matching the filters."""
+
+        entry = SCENE_INDEX.entry(node_path)
+        if not entry and not SCENE_INDEX.is_built():
+            # Not indexed yet, read the node alone.
+            node = hou.node(node_path)
+            entry = make_node_entry(node) if node else None
+
+        if not entry:
+            return []
+
         # get parm name pattern
         parm_name_pattern = self.ui_parm_name_filter_text.text()
         if not parm_name_pattern:
@@ -489,26 +770,7 @@ class FilePathManagerBrowser(QFrame):
         # get parm file type
         parm_file_type = self.ui_file_type_combo.currentText().lower()
 
-        # Get the selected nodes from node tree view
-        # Use selectedRows(0) because we just need one id per row.
-        id_list = self.ui_node_tree_view.selectionModel().selectedRows(0)
-
-        # Find all the filtered parms
-        parm_list = []
-        for index in id_list:
-
-            node = (self._node_tree_model.get_item(index)
-                    .get_raw_data().get_orig_data())
-
-            for parm in node.globParms(parm_name_pattern, ignore_case=True):
-
-                # Re-use the function from matchers
-                if matchers.parm_is_file_type(parm, parm_file_type,
-                                              match_invisible=False):
-                    parm_list.append(parm.path())
-
-        self.set_up_parm_tree_model(parm_list)
-        self.node_tree_view_config_post_model_setup()
+        return entry.match_file_parms(parm_name_pattern, parm_file_type)
 
     def update_parm_model(self, row_id, path):
         if not path:
@@ -563,33 +825,102 @@ class FilePathManagerBrowser(QFrame):
                                   .format(const.FILE_ACTIONS))
             return
 
-        # Process
-        # for parm in parm_list:
+        # Get parms from ids, skipping the ones without values.
+        parm_id_pairs = []
         for id_pair in id_list:
-
-            # get parm from id
             parm = (self._parm_tree_model.get_item(id_pair[0])
                     .get_raw_data().get_orig_data())
 
             if not parm.rawValue():
                 continue
 
-            # process parameter files
-            if file_action == const.FILE_ACTION_REPATH:
-                success = True
-            else:
-                success = utils.process_parm_files(parm, file_action,
-                                                   expanded_dest_dir)
-
-            if success:
-                # New file path (it is not expanded),
-                # so MUST use the non-expanded dest_dir !
-                basename = os.path.basename(parm.rawValue())
-                new_file_path = os.path.join(dest_dir, basename)
-
-                # Then set model data, the views will update automatically.
-                self._parm_tree_model.setData(id_pair[1], new_file_path,
-                                              Qt.EditRole)
+            parm_id_pairs.append((parm, id_pair[1]))
+
+        if not parm_id_pairs:
+            return
+
+        # Process parameter files of all the parms in one batch.
+        if file_action == const.FILE_ACTION_REPATH:
+            results = [True] * len(parm_id_pairs)
+        else:
+            results = self.run_transfers([pair[0] for pair in parm_id_pairs],
+                                         file_action, expanded_dest_dir)
+
+        for (parm, value_id), success in zip(parm_id_pairs, results):
+            if not success:
+                continue
+
+            # New file path (it is not expanded),
+            # so MUST use the non-expanded dest_dir !
+            new_file_path = core.new_file_path(parm.rawValue(), dest_dir)
+
+            # Then set model data, the views will update automatically.
+            self._parm_tree_model.setData(value_id, new_file_path,
+                                          Qt.EditRole)
+
+    def run_transfers(self, parms, file_action, dest_dir):
+        """
+        Copy, move or link the files of the parms with a progress dialog.
+        Returns a list of bool, one per parm.
+        """
+
+        plan = core.plan([parm.path() for parm in parms], dest_dir)
+        plan.print_collisions()
+        if not plan.transfers():
+            hou.ui.displayMessage('Nothing to process.')
+            return [False] * len(plan.jobs())
+
+        dialog = QProgressDialog('Processing {}.'.format(plan.summary()),
+                                 'Cancel', 0, 100, self)
+        dialog.setWindowTitle('Batch process')
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+
+        # The progress comes in batches at a fixed rate, not once per
+        # file.
+        last_progress = []
+
+        def on_progress(progress):
+            last_progress[:] = [progress]
+            # Don't let the dialog close itself before the end.
+            dialog.setValue(min(progress.percent(), 99))
+            dialog.setLabelText(progress.text())
+            QApplication.processEvents()
+
+        # The dialog emits canceled when it is closed as well, so the Cancel
+        # button is polled instead.
+        results = core.execute(plan, file_action,
+                               self.ui_transfer_workers_spin.value(),
+                               on_progress, dialog.wasCanceled)
+
+        cancelled = dialog.wasCanceled()
+        dialog.close()
+
+        if last_progress:
+            last_progress[0].print_failures()
+            print('{} {}'.format('Cancelled.' if cancelled else
+                                 'All files have been processed.',
+                                 last_progress[0].summary()))
+
+        return results
+
+    def on_browse_file(self, row_id):
+
+        index = self._parm_tree_model.index(row_id, 0)
+        parm = self._parm_tree_model.get_item(index).get_raw_data().get_orig_data()
+
+        file_type = matchers.parm_file_type(parm)
+        if file_type == 'image':
+            path = hou.ui.selectFile(default_value=parm.rawValue(),
+                                     file_type=hou.fileType.Image,
+                                     image_chooser=True)
+        elif file_type == 'geometry':
+            path = hou.ui.selectFile(default_value=parm.rawValue(),
+                                     file_type=hou.fileType.Geometry)
+        else:
+            path = hou.ui.selectFile(default_value=parm.rawValue())
+
+        self.update_parm_model(row_id, path)
 
     def on_preview_file(self, row_id):
 
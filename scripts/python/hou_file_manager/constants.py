@@ -20,40 +20,106 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import hou
-
 PATH_DELIMITER = '/'
 
 # Headers
 DEFAULT_TREE_HEADERS = ['Name', 'Value']
 NODE_TREE_HEADERS = ['Node View']
 FILE_PARM_LIST_HEADERS = ['Parameter View', 'Tools',
-                          'Raw Value (Double click to edit)']
+                          'Raw Value (Double click to edit)', 'Status']
 
+PARM_TREE_VIEW_TOOLS_COLUMN = 1
 PARM_TREE_VIEW_EDITABLE_COLUMN = 2
+PARM_TREE_VIEW_STATUS_COLUMN = 3
 
 # Getter attr
-PARM_GET_ATTRS = ['name', '', 'rawValue']
+PARM_GET_ATTRS = ['name', '', 'rawValue', '']
 NODE_GET_ATTRS = ['name']
 
 # Setter attr
-PARM_SET_ATTRS = ['', '', 'set']
+PARM_SET_ATTRS = ['', '', 'set', '']
 NODE_SET_ATTRS = ['']
 
 # File actions
 FILE_ACTION_COPY = 'copy'
 FILE_ACTION_MOVE = 'move'
 FILE_ACTION_REPATH = 'repath'
-FILE_ACTIONS = [FILE_ACTION_COPY, FILE_ACTION_MOVE, FILE_ACTION_REPATH]
+FILE_ACTION_LINK = 'link'
+FILE_ACTIONS = [FILE_ACTION_COPY, FILE_ACTION_MOVE, FILE_ACTION_REPATH,
+                FILE_ACTION_LINK]
+
+# Number of worker threads for copying or moving files.
+DEFAULT_TRANSFER_WORKERS = 8
+MAX_TRANSFER_WORKERS = 64
+
+# Journal of the completed files in a destination directory.
+TRANSFER_MANIFEST_NAME = '.hou_file_manager_manifest.json'
+TRANSFER_PARTIAL_SUFFIX = '.partial'
+TRANSFER_JOURNAL_FLUSH_COUNT = 50
+
+# Size of the chunks of data copied at a time.
+TRANSFER_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Transfer events, batched every TRANSFER_EVENT_INTERVAL seconds.
+TRANSFER_EVENT_PLANNED = 'planned'
+TRANSFER_EVENT_STARTED = 'started'
+TRANSFER_EVENT_BYTES = 'bytes'
+TRANSFER_EVENT_DONE = 'done'
+TRANSFER_EVENT_SKIPPED = 'skipped'
+TRANSFER_EVENT_FAILED = 'failed'
+TRANSFER_EVENT_INTERVAL = 0.1
+
+# Max number of directory listings kept in the directory listing cache.
+DIR_CACHE_SIZE = 256
+
+# The node tree is populated lazily, when the branches are expanded, above
+# this number of matched nodes, and only the first levels are expanded.
+NODE_TREE_LAZY_THRESHOLD = 2000
+NODE_TREE_AUTO_EXPAND_LEVELS = 2
+NODE_TREE_MAX_EXPAND_LEVELS = 32
+
+# Batch scan of .hip files, see batch_scan.
+BATCH_SCAN_HIP_EXTENSIONS = ('.hip', '.hiplc', '.hipnc')
+BATCH_SCAN_RECORD_PREFIX = '@hou_file_manager '
+BATCH_SCAN_WORKER_MODULE = 'hou_file_manager.batch_scan_worker'
+# Seconds a worker may spend on a .hip file.
+BATCH_SCAN_TIMEOUT = 30 * 60
+
+# Relative costs of the matchers, cheaper ones are evaluated first.
+MATCHER_COST_NAME = 1
+MATCHER_COST_TYPE = 2
+MATCHER_COST_PARM = 10
+
+# Time to wait for more scene changes before refreshing the browsers.
+SCENE_CHANGE_DEBOUNCE_MS = 200
+
+# Time to wait for more filter changes, like typing, before refreshing.
+REFRESH_DEBOUNCE_MS = 300
+
+# Max number of query results kept by the scene index.
+QUERY_CACHE_SIZE = 32
+
+# Milliseconds of scene scan per event loop iteration.
+SCAN_SLICE_MS = 8
+
+# The file status of the parms is checked by a pool of threads, and kept
+# for STAT_CACHE_TTL seconds.
+STATUS_CHECK_WORKERS = 4
+STAT_CACHE_TTL = 30
+STAT_CACHE_SIZE = 4096
+
 
+# Max number of icons and brushes shared by the tree models.
+ICON_CACHE_SIZE = 512
+BRUSH_CACHE_SIZE = 32
 
 # Colors
 BG_RED = (100, 0, 0)
 BG_GREEN = (0, 100, 0)
 
-# icons
-ICON_SIZE = hou.ui.scaledSize(16)
-ADD_ICON = hou.qt.createIcon("BUTTONS_list_add", ICON_SIZE, ICON_SIZE)
+# icons, created when the panel is built, see render_cache.
+ICON_SIZE = 16
+BROWSE_ICON_NAME = 'BUTTONS_chooser_file'
 
 SESSION_VAR = 'GLOBAL_BROWSER_UI_HOU_FILE_MANAGER'
 
@@ -0,0 +1,198 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+The API of the file manager without the UI, for scripts and hython:
+
+    from hou_file_manager import core
+
+    parm_paths = core.scan('/obj', file_type='image')
+    results = core.process(parm_paths, 'copy', '$HIP/tex')
+
+This module and the modules it imports must not import PySide2, so they
+stay fast to import in hython. See benchmarks/import_time.py.
+"""
+
+import os
+
+import hou
+
+from . import constants as const
+from . import matchers
+from . import utils
+from .scene_index import make_node_entry
+from .transfer import TransferEngine, TransferProgress
+
+
+def scan(root_path='/', node_name='*', node_type='*', parm_name='*',
+         file_type='image', match_invisible=False, index=None):
+    """
+    Returns the paths of the file parms under the root node which match the
+    filters, like the browser does. Patterns are Houdini multi name
+    patterns.
+
+    The nodes are walked once, without adding any callbacks to them. Pass
+    the scene_index.SCENE_INDEX of the session as index to query it
+    instead, e.g. when the browser has already indexed the scene.
+    """
+
+    file_type = file_type.lower()
+
+    if index is not None:
+        entries = [index.entry(p) for p in
+                   index.query(root_path, node_name, node_type, parm_name,
+                               file_type, match_invisible)]
+    else:
+        if file_type not in matchers.FILE_TYPE_DICT.keys():
+            raise Exception('The file type is not supported: {}'
+                            .format(file_type))
+
+        root_node = hou.node(root_path)
+        if not root_node:
+            raise ValueError('The root node does not exist: {}'
+                             .format(root_path))
+
+        # The same matching as the scene index.
+        pipeline = matchers.node_entry_pipeline(
+            node_name, node_type, parm_name, file_type, match_invisible)
+        entries = []
+        for node in root_node.allSubChildren(recurse_in_locked_nodes=False):
+            entry = make_node_entry(node)
+            if entry and pipeline.matches(entry):
+                entries.append(entry)
+
+    parm_paths = []
+    for entry in entries:
+        for file_parm in entry.match_file_parms(parm_name, file_type,
+                                                match_invisible):
+            parm_paths.append('{}/{}'.format(entry.path, file_parm.parm_name))
+
+    return parm_paths
+
+
+def expand_dest_dir(dest_dir):
+    """ Returns the expanded destination directory, which must exist."""
+
+    expanded_dest_dir = hou.text.expandString(dest_dir)
+    if not os.path.isdir(expanded_dest_dir):
+        raise ValueError('The expanded dest dir does not exist: {} ({})'
+                         .format(expanded_dest_dir, dest_dir))
+
+    return expanded_dest_dir
+
+
+def plan(parm_paths, dest_dir):
+    """
+    Returns the transfer.TransferPlan of the files of the parms, with one
+    job per parm.
+    """
+
+    parms = []
+    for path in parm_paths:
+        parm = hou.parm(path)
+        if parm is None:
+            raise ValueError('The parm does not exist: {}'.format(path))
+        parms.append(parm)
+
+    return utils.plan_parms_files(parms, expand_dest_dir(dest_dir))
+
+
+def execute(transfer_plan, file_action,
+            max_workers=const.DEFAULT_TRANSFER_WORKERS, on_progress=None,
+            should_cancel=None):
+    """
+    Copy, move or link the files of the plan. on_progress(progress) is
+    called with a transfer.TransferProgress for every batch of events, and
+    the batch is cancelled when should_cancel() returns True after it.
+    Returns a list of bool, one per job of the plan.
+    """
+
+    if file_action not in const.FILE_ACTIONS or \
+            file_action == const.FILE_ACTION_REPATH:
+        raise ValueError('The file action is not supported: {}'
+                         .format(file_action))
+
+    engine = TransferEngine(file_action, transfer_plan.dest_dir,
+                            max_workers=max_workers)
+    progress = TransferProgress()
+    for events in engine.run_iter(transfer_plan):
+        progress.update(events)
+        if on_progress:
+            on_progress(progress)
+        if should_cancel and should_cancel():
+            engine.cancel()
+
+    return engine.results
+
+
+def new_file_path(raw_value, dest_dir):
+    """
+    The raw value of a file parm pointing to the destination directory.
+    dest_dir is not expanded, so variables like $HIP are kept.
+    """
+
+    return os.path.join(dest_dir, os.path.basename(raw_value))
+
+
+def repath(parm_paths, dest_dir, results=None):
+    """
+    Point the file parms to the destination directory. If results are given,
+    only the parms with a True result are changed.
+    Returns the list of new raw values, None for the unchanged parms.
+    """
+
+    new_values = []
+    for i, path in enumerate(parm_paths):
+        parm = hou.parm(path)
+        if parm is None or not parm.rawValue() or \
+                (results is not None and not results[i]):
+            new_values.append(None)
+            continue
+
+        new_value = new_file_path(parm.rawValue(), dest_dir)
+        parm.set(new_value)
+        new_values.append(new_value)
+
+    return new_values
+
+
+def process(parm_paths, file_action, dest_dir,
+            max_workers=const.DEFAULT_TRANSFER_WORKERS, on_progress=None):
+    """
+    Transfer the files of the parms like the Run button of the browser, and
+    point the parms with all their files transferred to the destination
+    directory. Returns a list of bool, one per parm.
+    """
+
+    # Only the parms which exist, so the results match the plan.
+    parm_paths = [p for p in parm_paths if hou.parm(p) is not None]
+
+    if file_action == const.FILE_ACTION_REPATH:
+        results = [True] * len(parm_paths)
+    else:
+        transfer_plan = plan(parm_paths, dest_dir)
+        transfer_plan.print_collisions()
+        results = execute(transfer_plan, file_action, max_workers,
+                          on_progress)
+
+    repath(parm_paths, dest_dir, results)
+    return results
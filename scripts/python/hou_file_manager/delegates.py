@@ -0,0 +1,138 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from PySide2.QtCore import QEvent, QRect, QSize, Qt, Signal
+from PySide2.QtWidgets import (QApplication, QStyle, QStyledItemDelegate,
+                               QStyleOptionButton)
+
+from . import constants as const
+from .render_cache import ICON_CACHE, icon_size
+
+
+class ToolsItemDelegate(QStyledItemDelegate):
+    """
+    Paints the buttons of the Tools column of the parm view, instead of
+    having real button widgets for every row. Clicks on the buttons are
+    emitted with the row of the parm.
+    """
+
+    browse_clicked = Signal(int)
+    preview_clicked = Signal(int)
+
+    # Button ids, in the order they are painted.
+    BROWSE_BUTTON = 0
+    PREVIEW_BUTTON = 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        # (row, button id) of the button being pressed.
+        self._pressed = None
+
+    def _button_rects(self, rect):
+        size = max(1, min(rect.height(), rect.width() // 2))
+        top = rect.top() + (rect.height() - size) // 2
+        return [QRect(rect.left() + i * size, top, size, size)
+                for i in (self.BROWSE_BUTTON, self.PREVIEW_BUTTON)]
+
+    def _button_at(self, rect, pos):
+        for button_id, button_rect in enumerate(self._button_rects(rect)):
+            if button_rect.contains(pos):
+                return button_id
+
+        return None
+
+    def paint(self, painter, option, index):
+        # Background and selection.
+        super().paint(painter, option, index)
+
+        style = option.widget.style() if option.widget \
+            else QApplication.style()
+        size = icon_size()
+
+        for button_id, rect in enumerate(self._button_rects(option.rect)):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.state = QStyle.State_Enabled | QStyle.State_Raised
+            if self._pressed == (index.row(), button_id):
+                button.state |= QStyle.State_Sunken
+
+            if button_id == self.BROWSE_BUTTON:
+                button.icon = ICON_CACHE.get(const.BROWSE_ICON_NAME)
+                button.iconSize = QSize(size, size)
+            else:
+                button.text = 'P'
+
+            style.drawControl(QStyle.CE_PushButton, button, painter)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        return QSize(max(size.width(), 2 * size.height()), size.height())
+
+    def _set_pressed(self, pressed, option):
+        if pressed == self._pressed:
+            return
+
+        # Repaint the cell, or the whole view if the mouse was released over
+        # another cell, to show the sunken state.
+        in_cell = self._pressed is None or pressed is None
+        self._pressed = pressed
+        if option.widget is not None:
+            viewport = option.widget.viewport()
+            if in_cell:
+                viewport.update(option.rect)
+            else:
+                viewport.update()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress,
+                                QEvent.MouseButtonRelease,
+                                QEvent.MouseButtonDblClick):
+            return False
+
+        if event.button() != Qt.LeftButton:
+            return False
+
+        button_id = self._button_at(option.rect, event.pos())
+
+        if event.type() == QEvent.MouseButtonRelease:
+            pressed = self._pressed
+            self._set_pressed(None, option)
+            if button_id is None or pressed != (index.row(), button_id):
+                return False
+
+            if button_id == self.BROWSE_BUTTON:
+                self.browse_clicked.emit(index.row())
+            else:
+                self.preview_clicked.emit(index.row())
+            return True
+
+        if button_id is None:
+            return False
+
+        # The second click of a double click is swallowed, so its release
+        # doesn't click the button a second time.
+        if event.type() == QEvent.MouseButtonDblClick:
+            return True
+
+        self._set_pressed((index.row(), button_id), option)
+        return True
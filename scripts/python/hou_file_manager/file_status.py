@@ -0,0 +1,172 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import glob
+import os
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import constants as const
+from . import sequences
+from . import tiles
+
+# Status states
+STATUS_EXISTS = 'exists'
+STATUS_MISSING = 'missing'
+STATUS_PARTIAL = 'partial'
+STATUS_TILES = 'tiles'
+STATUS_EMPTY = 'empty'
+
+# state, text shown in the Status column, and tooltip.
+FileStatus = namedtuple('FileStatus', ['state', 'text', 'detail'])
+
+# What is checked for a file parm, read from the parm on the main thread.
+StatusKey = namedtuple('StatusKey',
+                       ['raw_value', 'eval_value', 'time_dependent'])
+
+
+def check_file_status(key):
+    """
+    Returns the FileStatus of the files referenced by a file parm. It only
+    touches the file system, no hou calls, so it can run in any thread.
+    """
+
+    raw_value, eval_value = key.raw_value, key.eval_value
+    if not raw_value:
+        return FileStatus(STATUS_EMPTY, '', '')
+
+    if tiles.has_tile_token(raw_value):
+        tile_set = tiles.resolve_tiles(eval_value)
+        if tile_set is None:
+            # Tokens in the directory part can't be resolved from one listing.
+            count = len(glob.glob(tiles.tile_glob_pattern(eval_value)))
+            detail = '{} tile(s)'.format(count) if count else 'no tiles'
+        else:
+            count = len(tile_set)
+            detail = tile_set.describe()
+
+        if not count:
+            return FileStatus(STATUS_MISSING, 'missing', detail)
+        return FileStatus(STATUS_TILES, '{} UDIM tiles found'.format(count),
+                          detail)
+
+    if key.time_dependent:
+        sequence = sequences.resolve_sequence(raw_value, eval_value)
+        if sequence is not None:
+            if not sequence.frames:
+                return FileStatus(STATUS_MISSING, 'missing',
+                                  sequence.describe())
+            if sequence.missing_count():
+                return FileStatus(STATUS_PARTIAL, 'partial sequence',
+                                  sequence.describe())
+            return FileStatus(STATUS_EXISTS, 'exists', sequence.describe())
+
+    if os.path.isfile(eval_value):
+        return FileStatus(STATUS_EXISTS, 'exists', eval_value)
+
+    return FileStatus(STATUS_MISSING, 'missing', eval_value)
+
+
+class StatCache:
+    """
+    Thread-safe cache of the FileStatus by StatusKey. The file system can
+    change behind our back, so the statuses expire after ttl seconds.
+    """
+
+    def __init__(self, ttl=const.STAT_CACHE_TTL,
+                 max_size=const.STAT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max(1, int(max_size))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """ Returns the cached FileStatus, or None if unknown or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            checked, status = entry
+            if time.monotonic() - checked > self.ttl:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return status
+
+    def put(self, key, status):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), status)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# The cache shared by all the views.
+STAT_CACHE = StatCache()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=const.STATUS_CHECK_WORKERS,
+                thread_name_prefix='hou_file_manager_status')
+
+    return _executor
+
+
+def _check_and_cache(key, callback):
+    status = STAT_CACHE.get(key)
+    if status is None:
+        try:
+            status = check_file_status(key)
+        except Exception as e:
+            status = FileStatus(STATUS_MISSING, 'error', str(e))
+        STAT_CACHE.put(key, status)
+
+    callback(key, status)
+
+
+def submit_status_check(key, callback):
+    """
+    Check the status of the key in the thread pool, and call
+    callback(key, status) from the worker thread when it is known.
+    """
+
+    return _get_executor().submit(_check_and_cache, key, callback)
@@ -0,0 +1,132 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import threading
+from collections import OrderedDict
+
+from . import constants as const
+
+
+class _DirEntry:
+    def __init__(self, mtime, names):
+        self.mtime = mtime
+        self.names = names
+
+        # Structures built from the names, like sequence indexes.
+        self.derived = {}
+
+
+class DirListingCache:
+    """
+    Bounded LRU cache of directory listings.
+
+    A listing is the names of the files in a directory, read with one
+    os.scandir call, so sub-directories are left out without stat calls on
+    most file systems. Each listing is keyed by the directory path and is
+    only valid as long as the modification time of the directory doesn't
+    change, so a listing costs one stat call when it is cached.
+    """
+
+    def __init__(self, max_size=const.DIR_CACHE_SIZE):
+        self.max_size = max(1, int(max_size))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_entry(self, dirname):
+        key = os.path.normcase(os.path.abspath(dirname))
+
+        try:
+            mtime = os.stat(key).st_mtime_ns
+        except OSError:
+            self.invalidate(dirname)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.mtime == mtime:
+                self._entries.move_to_end(key)
+                return entry
+
+        try:
+            with os.scandir(key) as it:
+                names = tuple(e.name for e in it if e.is_file())
+        except OSError:
+            return None
+
+        entry = _DirEntry(mtime, names)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def list_files(self, dirname) -> tuple:
+        """
+        Returns a tuple of the names of the files in the directory.
+        Returns an empty tuple if the directory can't be listed.
+        """
+
+        entry = self._get_entry(dirname)
+        if not entry:
+            return ()
+
+        return entry.names
+
+    def get_derived(self, dirname, key, factory):
+        """
+        Returns a structure built from the listing of the directory by
+        factory(names). It is cached along with the listing, so it is
+        rebuilt only when the directory changes.
+        """
+
+        entry = self._get_entry(dirname)
+        if not entry:
+            return factory(())
+
+        with self._lock:
+            if key in entry.derived:
+                return entry.derived[key]
+
+        value = factory(entry.names)
+        with self._lock:
+            entry.derived[key] = value
+
+        return value
+
+    def invalidate(self, dirname):
+        key = os.path.normcase(os.path.abspath(dirname))
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# The cache shared by all the file resolutions.
+DIR_CACHE = DirListingCache()
@@ -20,42 +20,74 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import bisect
+from collections import OrderedDict
+
 from PySide2.QtCore import QAbstractItemModel
 from PySide2.QtCore import QModelIndex
+from PySide2.QtCore import Signal
 
 from PySide2.QtCore import Qt
 
 import hou
 
 from . import constants as const
+from . import file_status
+from .file_status import STAT_CACHE
+from .render_cache import BRUSH_CACHE, ICON_CACHE
+from .scene_watcher import SCENE_WATCHER
 from .treemodel import (BaseTreeModel, TreeItem, TreeItemDataGenericList, BaseTreeItemData)
 
 
 class TreeItemDataObject(BaseTreeItemData):
+    """
+    Item data of a hou object. The displayed values are read once into a
+    snapshot, so the views never call the hou API when they paint. The
+    snapshot is refreshed by set_data, or by calling refresh when the hou
+    object changes.
+    """
+
     def __init__(self, orig_data, property_get_attrs, property_set_attrs,
-                 bg_color=None):
+                 bg_color=None, snapshot=None):
         super().__init__(orig_data)
 
         self._property_get_attrs = property_get_attrs
         self._property_set_attrs = property_set_attrs
         self._bg_color = bg_color
 
-        if isinstance(orig_data, hou.OpNode):
-            orig_data.addEventCallback((hou.nodeEventType.BeingDeleted, ),
-                                       self.data_deleted)
+        # The displayed values, one per get attr.
+        if snapshot is None:
+            snapshot = self._read_snapshot()
+        self._snapshot = list(snapshot)
+
+    def _read_snapshot(self):
+        snapshot = []
+        for attr in self._property_get_attrs:
+            if attr and hasattr(self._orig_data, attr):
+                snapshot.append(getattr(self._orig_data, attr)())
+            else:
+                snapshot.append(None)
+
+        return snapshot
+
+    def refresh(self):
+        """ Read the displayed values again from the hou object."""
+
+        try:
+            self._snapshot = self._read_snapshot()
+        except hou.ObjectWasDeleted:
+            return False
+
+        return True
 
     def len(self):
         return len(self._property_get_attrs)
 
     def get(self, column: int = 0):
-        if column < 0 or column >= len(self._property_get_attrs):
+        if column < 0 or column >= len(self._snapshot):
             return None
 
-        attr = self._property_get_attrs[column]
-        if not hasattr(self._orig_data, attr):
-            return None
-
-        return getattr(self._orig_data, attr)()
+        return self._snapshot[column]
 
     def set_data(self, column: int, value):
         if column < 0 or column >= len(self._property_set_attrs):
@@ -66,6 +98,9 @@ class TreeItemDataObject(BaseTreeItemData):
             return False
 
         getattr(self._orig_data, attr)(value)
+
+        # The value may be changed by the setter, so read it back.
+        self.refresh()
         return True
 
     def get_bg_color(self):
@@ -75,27 +110,46 @@ class TreeItemDataObject(BaseTreeItemData):
         if not isinstance(self._orig_data, hou.OpNode):
             return None
 
-        icon_name = self._orig_data.type().icon()
-        return hou.qt.createIcon(icon_name)
+        # Looked up on the first paint only, and shared by the node type.
+        if self._icon is None:
+            try:
+                self._icon = ICON_CACHE.get(self._orig_data.type().icon())
+            except hou.ObjectWasDeleted:
+                return None
 
-    def data_deleted(self, node, event_type, **kwargs):
-        if not hasattr(hou.session, const.SESSION_VAR):
-            print('No Hou File Manager UI in hou.session to refresh.')
-            return
+        return self._icon
 
-        browser = getattr(hou.session,  const.SESSION_VAR)
-        if not browser:
-            print('Browser not found from session var.')
-            return
 
-        browser.on_reset()
+def _parent_path(path):
+    """ The parent of a node path, where '' is the root."""
+    return path.rpartition(const.PATH_DELIMITER)[0]
 
 
 class HouNodeTreeModel(BaseTreeModel):
-    def __init__(self, path_list: list, parent=None):
+    """
+    Tree of node paths, where the matched nodes are highlighted.
+
+    The structure of the tree is kept as plain strings (parent path -> child
+    names), and the tree items, which hold the hou nodes, are only created
+    for the parents whose children are fetched. In lazy mode, children are
+    fetched when their parent is expanded in the view (canFetchMore and
+    fetchMore), otherwise all the items are created at once.
+    """
+
+    def __init__(self, path_list: list, lazy=False, parent=None):
 
         self._property_get_attrs = const.NODE_GET_ATTRS
         self._property_set_attrs = const.NODE_SET_ATTRS
+        self._lazy = lazy
+
+        # Paths of the matched (highlighted) nodes.
+        self._leaf_paths = set()
+
+        # parent path -> set of child names. The root path is ''.
+        self._child_names = {}
+
+        # Parent paths whose children have tree items.
+        self._fetched = set()
 
         # Headers
         headers = const.NODE_TREE_HEADERS
@@ -110,6 +164,9 @@ class HouNodeTreeModel(BaseTreeModel):
 
         super().__init__(path_list, headers, root_item, parent)
 
+    def is_lazy(self):
+        return self._lazy
+
     def flags(self, index: QModelIndex) -> Qt.ItemFlags:
         if not index.isValid():
             return Qt.NoItemFlags
@@ -125,16 +182,237 @@ class HouNodeTreeModel(BaseTreeModel):
 
         return flags
 
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid() and parent.column() > 0:
+            return False
+
+        return bool(self._child_names.get(self.item_path(
+            self.get_item(parent))))
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        path = self.item_path(self.get_item(parent))
+        return path not in self._fetched and bool(self._child_names.get(path))
+
+    def fetchMore(self, parent: QModelIndex):
+        item = self.get_item(parent)
+        path = self.item_path(item)
+        if path in self._fetched:
+            return
+
+        names = sorted(self._child_names.get(path, ()))
+        if not names:
+            self._fetched.add(path)
+            return
+
+        self.beginInsertRows(parent, 0, len(names) - 1)
+        self._create_children(item, path, names)
+        self.endInsertRows()
+
     def set_up_model_data(self, data: list):
         """ Data is a string list of paths of Hou Nodes."""
 
-        # Must sort the path list
-        data.sort()
-
         for path in data:
-            self.add_path_to_tree(path, self._root_item,'',
-                                  self._property_get_attrs,
-                                  self._property_set_attrs)
+            self._add_path_structure(path)
+
+        self._leaf_paths = set(data)
+
+        if not self._lazy:
+            self._create_all_children(self._root_item, '')
+
+    def leaf_paths(self):
+        return self._leaf_paths
+
+    def item_path(self, item: TreeItem) -> str:
+        """ The node path of a tree item, built from the keys."""
+
+        parts = []
+        while item and item != self._root_item:
+            parts.append(item.key())
+            item = item.parent()
+
+        if not parts:
+            return ''
+
+        return const.PATH_DELIMITER + const.PATH_DELIMITER.join(
+            reversed(parts))
+
+    def find_item(self, path):
+        """ Returns the tree item of the node path, or None if not created."""
+
+        item = self._root_item
+        for part in path.strip(const.PATH_DELIMITER).split(
+                const.PATH_DELIMITER):
+            item = item.get_child_by_key(part)
+            if not item:
+                return None
+
+        return item
+
+    def set_paths(self, path_list: list) -> list:
+        """
+        Update the tree to the new list of node paths, inserting and removing
+        only the rows which differ. Returns the indexes of the added items
+        which have been created.
+        """
+
+        new_paths = set(path_list)
+        removed = self._leaf_paths - new_paths
+        added = new_paths - self._leaf_paths
+        self._leaf_paths = new_paths
+
+        # Children before parents, so empty parents can be pruned.
+        for path in sorted(removed, reverse=True):
+            self._remove_leaf_path(path)
+
+        return self._insert_leaf_paths(added)
+
+    def add_paths(self, path_list: list) -> list:
+        """
+        Add node paths to the tree, like the matches of a running scan.
+        Returns the indexes of the added items which have been created.
+        """
+
+        added = set(path_list) - self._leaf_paths
+        self._leaf_paths.update(added)
+
+        return self._insert_leaf_paths(added)
+
+    def _add_path_structure(self, path):
+        parent_path = ''
+        for part in path.strip(const.PATH_DELIMITER).split(
+                const.PATH_DELIMITER):
+            self._child_names.setdefault(parent_path, set()).add(part)
+            parent_path = '{}{}{}'.format(parent_path, const.PATH_DELIMITER,
+                                          part)
+
+    def _create_item(self, path, name):
+        # The only displayed value is the name, which is known already.
+        return TreeItem(
+            TreeItemDataObject(hou.node(path),
+                               self._property_get_attrs,
+                               self._property_set_attrs,
+                               const.BG_RED if path in self._leaf_paths
+                               else None,
+                               snapshot=[name]),
+            key=name
+        )
+
+    def _create_children(self, item, path, names):
+        for name in names:
+            child_path = '{}{}{}'.format(path, const.PATH_DELIMITER, name)
+            item.append_child(self._create_item(child_path, name))
+
+        self._fetched.add(path)
+
+    def _create_all_children(self, item, path):
+        self._create_children(item, path,
+                              sorted(self._child_names.get(path, ())))
+        for child in item.children():
+            self._create_all_children(
+                child, '{}{}{}'.format(path, const.PATH_DELIMITER,
+                                       child.key()))
+
+    def _remove_leaf_path(self, path):
+        # Still the parent of other matched nodes, just un-highlight it.
+        if self._child_names.get(path):
+            item = self.find_item(path)
+            if item:
+                item.get_raw_data().set_bg_color(None)
+                self.item_data_changed(item)
+            return
+
+        # Remove the path and the parents with nothing left to show.
+        while path and not self._child_names.get(path) and \
+                path not in self._leaf_paths:
+            self._child_names.pop(path, None)
+            self._fetched.discard(path)
+
+            parent_path = _parent_path(path)
+            self._child_names[parent_path].discard(
+                path.rpartition(const.PATH_DELIMITER)[2])
+
+            if parent_path in self._fetched:
+                item = self.find_item(path)
+                if item:
+                    self.remove_item(item)
+
+            path = parent_path
+
+    def _insert_leaf_paths(self, paths):
+        """
+        Add the new matched node paths, and returns the indexes of their
+        items which have been created. The new children of every fetched
+        parent are inserted together, one run of consecutive rows at a time.
+        """
+
+        # fetched parent path -> names of its new children
+        new_names = {}
+        highlighted = []
+
+        for path in paths:
+            parent_path = ''
+            for part in path.strip(const.PATH_DELIMITER).split(
+                    const.PATH_DELIMITER):
+                current_path = '{}{}{}'.format(parent_path,
+                                               const.PATH_DELIMITER, part)
+                names = self._child_names.setdefault(parent_path, set())
+                if part not in names:
+                    names.add(part)
+
+                    # The item is created later if the parent isn't fetched.
+                    if parent_path in self._fetched:
+                        new_names.setdefault(parent_path, set()).add(part)
+
+                elif current_path == path and parent_path in self._fetched:
+                    # An existing parent item which is matched now.
+                    highlighted.append(path)
+
+                parent_path = current_path
+
+        for parent_path, names in new_names.items():
+            self._insert_children(parent_path, sorted(names))
+
+        for path in highlighted:
+            item = self.find_item(path)
+            if item:
+                item.get_raw_data().set_bg_color(const.BG_RED)
+                self.item_data_changed(item)
+
+        added_indexes = []
+        for path in sorted(paths):
+            item = self.find_item(path)
+            if item:
+                added_indexes.append(self.index_of_item(item))
+
+        return added_indexes
+
+    def _insert_children(self, parent_path, names):
+        item = self.find_item(parent_path) if parent_path \
+            else self._root_item
+        if not item:
+            return
+
+        # Keep the children sorted by name, the new names which go between
+        # the same existing children are inserted at once.
+        keys = [child.key() for child in item.children()]
+        runs = {}
+        for name in names:
+            runs.setdefault(bisect.bisect(keys, name), []).append(name)
+
+        inserted = 0
+        for position in sorted(runs):
+            children = []
+            for name in runs[position]:
+                child_path = '{}{}{}'.format(parent_path,
+                                             const.PATH_DELIMITER, name)
+                child = self._create_item(child_path, name)
+
+                # The whole new sub-tree is known, so it is created now.
+                self._create_all_children(child, child_path)
+                children.append(child)
+
+            self.insert_items(item, position + inserted, children)
+            inserted += len(children)
 
     def get_hou_object(self, index: QModelIndex):
         if not index.isValid():
@@ -145,44 +423,20 @@ class HouNodeTreeModel(BaseTreeModel):
 
         return item.tree_item_data().get_orig_data()
 
-    def add_path_to_tree(self, path, target_tree_item, current_path,
-                         property_get_attrs, property_set_attrs):
-        parts = path.strip(const.PATH_DELIMITER).split(const.PATH_DELIMITER)
 
-        current = parts[0]
-        the_rest = parts[1:]
-
-        child = target_tree_item.get_child_by_column_data(current)
-        current_path = '{}{}{}'.format(current_path,
-                                       const.PATH_DELIMITER,
-                                       current)
-
-        if not child:
-            # get the hou node
-            hou_node = hou.node(current_path)
-            # create a tree item
-            if not the_rest:
-                bg_color = const.BG_RED
-            else:
-                bg_color = None
-            child = TreeItem(
-                TreeItemDataObject(hou_node,
-                                   property_get_attrs,
-                                   property_set_attrs,
-                                   bg_color)
-            )
-            target_tree_item.append_child(child)
+class HouParmTreeModel(BaseTreeModel):
+    """
+    List of file parms, grouped by node. The rows of a node are kept
+    together, so a node can be added or removed with one row operation when
+    the node selection changes.
 
-        if the_rest:
-            # continue adding the rest
-            self.add_path_to_tree(const.PATH_DELIMITER.join(the_rest),
-                                  child,
-                                  current_path,
-                                  property_get_attrs,
-                                  property_set_attrs)
+    The Status column is filled in by the file_status thread pool. The
+    results come back to the main thread through the status_ready signal.
+    """
 
+    # StatusKey, FileStatus, emitted from the worker threads.
+    status_ready = Signal(object, object)
 
-class HouParmTreeModel(BaseTreeModel):
     def __init__(self, node_list: list, parent=None):
 
         self._property_get_attrs = const.PARM_GET_ATTRS
@@ -190,10 +444,52 @@ class HouParmTreeModel(BaseTreeModel):
 
         headers = const.FILE_PARM_LIST_HEADERS
 
-        root_item = TreeItem(TreeItemDataGenericList(['', '', '']))
+        root_item = TreeItem(TreeItemDataGenericList(['', '', '', '']))
+
+        # node path -> parm items, in the order of the rows.
+        self._node_items = OrderedDict()
+
+        # parm path -> StatusKey and FileStatus of the row, and the parm
+        # paths waiting for the status of a StatusKey.
+        self._status_keys = {}
+        self._statuses = {}
+        self._pending_status = {}
 
         super().__init__(node_list, headers, root_item, parent)
 
+        # Queued, as it is emitted from the worker threads.
+        self.status_ready.connect(self._on_status_ready)
+        self.check_status()
+
+        # The nodes with file parms are watched by the scene watcher.
+        SCENE_WATCHER.add_listener(self._on_scene_event)
+
+    def data(self, index: QModelIndex, role: Qt.ItemDataRole = Qt.DisplayRole):
+        if not index.isValid() or \
+                index.column() != const.PARM_TREE_VIEW_STATUS_COLUMN:
+            return super().data(index, role)
+
+        parm_path = self.get_item(index).key()
+        status = self._statuses.get(parm_path)
+        if role == Qt.DisplayRole:
+            if status is None:
+                return 'checking...' if parm_path in self._status_keys \
+                    else None
+            return status.text
+
+        if status is None:
+            return None
+
+        if role == Qt.ToolTipRole:
+            return status.detail
+
+        if role == Qt.BackgroundRole and \
+                status.state in (file_status.STATUS_MISSING,
+                                 file_status.STATUS_PARTIAL):
+            return BRUSH_CACHE.get(const.BG_RED)
+
+        return None
+
     def flags(self, index: QModelIndex) -> Qt.ItemFlags:
         if not index.isValid():
             return Qt.NoItemFlag
@@ -213,11 +509,189 @@ class HouParmTreeModel(BaseTreeModel):
             child = TreeItem(
                 TreeItemDataObject(parm,
                                    self._property_get_attrs,
-                                   self._property_set_attrs)
+                                   self._property_set_attrs),
+                key=parm_path
             )
-            self._root_item.append_child(child)
 
-            # then add file parameters as children to the node
+            node_path = parm.node().path()
+            items = self._node_items.get(node_path)
+            if items:
+                # Keep the rows of the node together.
+                self._root_item.insert_child(
+                    items[-1].get_row_id() + 1, child)
+            else:
+                items = self._node_items[node_path] = []
+                self._root_item.append_child(child)
+            items.append(child)
+
+    def node_paths(self):
+        return list(self._node_items.keys())
+
+    def add_node_parms(self, node_path, file_parms):
+        """
+        Append the rows of the file parms of a node, where file_parms are
+        FileParmEntry of the scene index.
+        """
+
+        if node_path in self._node_items or not file_parms:
+            return
+
+        items = []
+        for file_parm in file_parms:
+            parm_path = '{}/{}'.format(node_path, file_parm.parm_name)
+            parm = hou.parm(parm_path)
+            if parm is None:
+                continue
+
+            # The displayed values are known from the index.
+            items.append(TreeItem(
+                TreeItemDataObject(parm,
+                                   self._property_get_attrs,
+                                   self._property_set_attrs,
+                                   snapshot=[file_parm.parm_name, None,
+                                             file_parm.raw_value, None]),
+                key=parm_path
+            ))
+
+        if not items:
+            return
+
+        # The rows are not in the model yet, no need to notify the views.
+        for item in items:
+            self._check_item_status(item, notify=False)
+
+        position = self._root_item.child_count()
+        self.beginInsertRows(QModelIndex(), position,
+                             position + len(items) - 1)
+        for item in items:
+            self._root_item.append_child(item)
+        self.endInsertRows()
+
+        self._node_items[node_path] = items
+
+    def remove_node_parms(self, node_path):
+        items = self._node_items.pop(node_path, None)
+        if not items:
+            return
+
+        # Pending statuses of the removed rows are dropped when they arrive.
+        for item in items:
+            self._status_keys.pop(item.key(), None)
+            self._statuses.pop(item.key(), None)
+
+        self.removeRows(items[0].get_row_id(), len(items))
+
+    def set_node_parms(self, node_parms):
+        """
+        Update the rows to the list of (node path, file parms), removing
+        and adding only the nodes which differ.
+        """
+
+        node_parms = OrderedDict(node_parms)
+
+        for node_path, items in list(self._node_items.items()):
+            file_parms = node_parms.get(node_path)
+            if file_parms is None or \
+                    [i.key() for i in items] != \
+                    ['{}/{}'.format(node_path, p.parm_name)
+                     for p in file_parms]:
+                self.remove_node_parms(node_path)
+
+        for node_path, file_parms in node_parms.items():
+            self.add_node_parms(node_path, file_parms)
+
+    def check_status(self):
+        """ Check the file status of all the rows again."""
+
+        for items in self._node_items.values():
+            for item in items:
+                self._check_item_status(item)
+
+    def _check_item_status(self, item, notify=True):
+        """
+        Read what to check from the parm, in the main thread, and get its
+        status from the stat cache or the thread pool.
+        """
+
+        item_data = item.get_raw_data()
+        parm = item_data.get_orig_data()
+        try:
+            key = file_status.StatusKey(
+                item_data.get(const.PARM_TREE_VIEW_EDITABLE_COLUMN),
+                parm.eval(), parm.isTimeDependent())
+        except hou.ObjectWasDeleted:
+            return
+
+        parm_path = item.key()
+        self._status_keys[parm_path] = key
+
+        status = STAT_CACHE.get(key)
+        if status is not None:
+            self._set_item_status(item, status, notify)
+            return
+
+        if self._statuses.pop(parm_path, None) is not None and notify:
+            self._status_data_changed(item)
+
+        # Rows with the same files share the check.
+        parm_paths = self._pending_status.get(key)
+        if parm_paths is not None:
+            parm_paths.add(parm_path)
+            return
+
+        self._pending_status[key] = {parm_path}
+        file_status.submit_status_check(key, self._emit_status_ready)
+
+    def _emit_status_ready(self, key, status):
+        # Called from a worker thread.
+        try:
+            self.status_ready.emit(key, status)
+        except RuntimeError:
+            # The model was deleted meanwhile.
+            pass
+
+    def _on_status_ready(self, key, status):
+        for parm_path in self._pending_status.pop(key, ()):
+            # The row may have changed or been removed meanwhile.
+            if self._status_keys.get(parm_path) != key:
+                continue
+
+            item = self._root_item.get_child_by_key(parm_path)
+            if item is not None:
+                self._set_item_status(item, status)
+
+    def _set_item_status(self, item, status, notify=True):
+        self._statuses[item.key()] = status
+        if notify:
+            self._status_data_changed(item)
+
+    def _status_data_changed(self, item):
+        index = self.index_of_item(item, const.PARM_TREE_VIEW_STATUS_COLUMN)
+        self.dataChanged.emit(index, index)
+
+    def remove_callbacks(self):
+        SCENE_WATCHER.remove_listener(self._on_scene_event)
+        self._pending_status.clear()
+
+    def _on_scene_event(self, event_type, **kwargs):
+        if event_type != hou.nodeEventType.ParmTupleChanged:
+            return
+
+        items = self._node_items.get(kwargs['node'].path())
+        if not items:
+            return
+
+        # parm_tuple is None when many parms changed at once.
+        parm_tuple = kwargs.get('parm_tuple')
+        for item in items:
+            item_data = item.get_raw_data()
+            if parm_tuple is not None and \
+                    item_data.get_orig_data().tuple() != parm_tuple:
+                continue
+
+            if item_data.refresh():
+                self.item_data_changed(item)
+                self._check_item_status(item)
 
     def get_hou_object(self,  index: QModelIndex):
         if not index.isValid():
@@ -227,6 +701,3 @@ class HouParmTreeModel(BaseTreeModel):
         item = self.get_item(index)
 
         return item.tree_item_data().get_orig_data()
-
-
-
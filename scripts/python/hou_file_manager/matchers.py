@@ -20,32 +20,174 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import time
+
 import hou
 from nodesearch.matchers import Matcher
 
+from . import constants as const
+
 FILE_TYPE_DICT = {'image': hou.fileType.Image,
                   'geometry': hou.fileType.Geometry}
 
 
+def classify_parm_template(pt):
+    """
+    Returns the lower case file type name of a file reference parm
+    template, or None if it is not a file reference parm template.
+    """
+
+    if not isinstance(pt, hou.StringParmTemplate):
+        return None
+
+    if not pt.stringType() == hou.stringParmType.FileReference:
+        return None
+
+    return pt.fileType().name().lower()
+
+
+def node_type_key(node):
+    """
+    The key of the type definition of a node: the type name with its
+    category, and the library file of the HDA definition if any.
+    """
+
+    node_type = node.type()
+    definition = node_type.definition()
+    library = definition.libraryFilePath() if definition else ''
+
+    return node_type.nameWithCategory(), library
+
+
+class ParmFileTypeCache:
+    """
+    Cache of the file types of parms, keyed by (node type key, parm name),
+    since the parm templates are the same for all the instances of a node
+    type. Spare parms belong to the instances, so they are not cached.
+
+    The cache is cleared when HDA definitions are created, deleted, saved,
+    installed or uninstalled, and the listeners are called with the list of
+    the hou.NodeType of the changed definitions, or None if they are not
+    known.
+    """
+
+    def __init__(self):
+        # node type key -> {parm name -> file type or None}
+        self._types = {}
+        self._watching = False
+        self._listeners = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return sum(len(parms) for parms in self._types.values())
+
+    def file_type(self, parm, type_key=None):
+        """
+        Returns the lower case file type name of the parm, or None.
+        type_key is node_type_key of the node of the parm, which can be
+        passed in when classifying many parms of the same node.
+        """
+
+        if parm.isSpare():
+            return classify_parm_template(parm.parmTemplate())
+
+        if type_key is None:
+            type_key = node_type_key(parm.node())
+
+        parms = self._types.get(type_key)
+        if parms is None:
+            self._watch_hdas()
+            parms = self._types[type_key] = {}
+
+        name = parm.name()
+        if name in parms:
+            self.hits += 1
+            return parms[name]
+
+        self.misses += 1
+        file_type = parms[name] = classify_parm_template(parm.parmTemplate())
+        return file_type
+
+    def clear(self):
+        self._types.clear()
+
+    def add_listener(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _watch_hdas(self):
+        if self._watching:
+            return
+
+        hou.hda.addEventCallback((hou.hdaEventType.AssetCreated,
+                                  hou.hdaEventType.AssetDeleted,
+                                  hou.hdaEventType.AssetSaved,
+                                  hou.hdaEventType.LibraryInstalled,
+                                  hou.hdaEventType.LibraryUninstalled),
+                                 self._on_hda_event)
+        self._watching = True
+
+    def _on_hda_event(self, event_type, **kwargs):
+        self.clear()
+
+        node_types = None
+        if event_type != hou.hdaEventType.AssetDeleted:
+            node_types = _hda_event_node_types(kwargs)
+
+        for listener in list(self._listeners):
+            listener(node_types)
+
+
+def _hda_event_node_types(kwargs):
+    """
+    Returns the node types of the definitions of an HDA event, or None if
+    they can't be found, e.g. when they are not installed anymore.
+    """
+
+    try:
+        definition = kwargs.get('asset_definition')
+        if definition is not None:
+            definitions = [definition]
+        elif kwargs.get('library_path'):
+            definitions = hou.hda.definitionsInFile(kwargs['library_path'])
+        else:
+            return None
+
+        node_types = [d.nodeType() for d in definitions]
+    except (hou.OperationFailed, hou.ObjectWasDeleted):
+        return None
+
+    if None in node_types:
+        return None
+
+    return node_types
+
+
+# The cache shared by all the matchers and the scene index.
+PARM_FILE_TYPE_CACHE = ParmFileTypeCache()
+
+
+def parm_file_type(parm, type_key=None):
+    """
+    Returns the lower case file type name of a file reference parm,
+    or None if the parm is not a file reference parm.
+    """
+
+    return PARM_FILE_TYPE_CACHE.file_type(parm, type_key)
+
+
 def parm_is_file_type(parm, file_type, match_invisible=False):
         # No need to match when the parm is invisible and we don't want to
         # match invisible parms.
         if not match_invisible and not parm.isVisible():
             return False
 
-        # Get parmTemplate of the parm.
-        pt = parm.parmTemplate()
-
-        if not isinstance(pt, hou.StringParmTemplate):
-            return False
-
-        if not pt.stringType() == hou.stringParmType.FileReference:
-            return False
-
-        # It will return True once any parm meets the condition.
-        # No need to continue checking all the rest of the parms.
-        if pt.fileType().name().lower() == file_type:
-            return True
+        return parm_file_type(parm) == file_type
 
 
 class ParmNameAndFileType(Matcher):
@@ -80,3 +222,99 @@ class ParmNameAndFileType(Matcher):
 
         return False
 
+
+class MatcherStage:
+    """
+    A predicate of a MatcherPipeline, with its relative cost and the
+    statistics of its calls.
+    """
+
+    def __init__(self, name, predicate, cost):
+        self.name = name
+        self.predicate = predicate
+        self.cost = cost
+        self.reset_stats()
+
+    def __repr__(self):
+        return ('<{} {} cost={}>'
+                .format(type(self).__name__, self.name, self.cost))
+
+    def reset_stats(self):
+        self.calls = 0
+        self.rejections = 0
+        self.seconds = 0.0
+
+
+class MatcherPipeline:
+    """
+    Matches objects against stages in the order of their costs, so the
+    cheap predicates like names and types reject most objects before the
+    expensive ones like parms are evaluated. The time spent in, and the
+    objects rejected by, each stage are recorded.
+    """
+
+    def __init__(self, stages):
+        self.stages = sorted(stages, key=lambda stage: stage.cost)
+
+    def matches(self, obj):
+        for stage in self.stages:
+            start = time.perf_counter()
+            result = stage.predicate(obj)
+            stage.seconds += time.perf_counter() - start
+            stage.calls += 1
+
+            if not result:
+                stage.rejections += 1
+                return False
+
+        return True
+
+    def filter(self, objs):
+        return [obj for obj in objs if self.matches(obj)]
+
+    def reset_stats(self):
+        for stage in self.stages:
+            stage.reset_stats()
+
+    def stats(self):
+        return [{'name': stage.name, 'cost': stage.cost,
+                 'calls': stage.calls, 'rejections': stage.rejections,
+                 'seconds': stage.seconds}
+                for stage in self.stages]
+
+    def print_stats(self):
+        for stage in self.stages:
+            print('{}: {} call(s), {} rejected, {:.3f}s'
+                  .format(stage.name, stage.calls, stage.rejections,
+                          stage.seconds))
+
+
+def node_entry_pipeline(name_pattern, type_pattern, parm_pattern, file_type,
+                        match_invisible=False, ignore_case=True):
+    """
+    Returns the MatcherPipeline of the browser filters for the node entries
+    of the scene index. Patterns of '*' match everything, so they have no
+    stage.
+    """
+
+    stages = []
+    if name_pattern != '*':
+        stages.append(MatcherStage(
+            'Node Name',
+            lambda e: hou.patternMatch(name_pattern, e.name, ignore_case),
+            const.MATCHER_COST_NAME))
+
+    if type_pattern != '*':
+        stages.append(MatcherStage(
+            'Node Type',
+            lambda e: hou.patternMatch(type_pattern, e.type_name,
+                                       ignore_case),
+            const.MATCHER_COST_TYPE))
+
+    stages.append(MatcherStage(
+        'Parm Name and File Type',
+        lambda e: e.match_file_parms(parm_pattern, file_type, match_invisible,
+                                     ignore_case),
+        const.MATCHER_COST_PARM))
+
+    return MatcherPipeline(stages)
@@ -0,0 +1,102 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections import OrderedDict
+
+from PySide2.QtGui import QBrush, QColor
+
+import hou
+
+from . import constants as const
+
+
+class ResourceCache:
+    """
+    Bounded LRU cache of the resources created by factory(key), like icons
+    and brushes, shared by all the models. The hits and misses are counted
+    for profiling.
+    """
+
+    def __init__(self, factory, max_size):
+        self.max_size = max(1, int(max_size))
+        self._factory = factory
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = self._factory(key)
+        self._entries[key] = value
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        return value
+
+    def stats(self):
+        return {'size': len(self._entries), 'hits': self.hits,
+                'misses': self.misses}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._entries.clear()
+        self.reset_stats()
+
+
+def _create_icon(icon_name):
+    return hou.qt.createIcon(icon_name)
+
+
+def _create_brush(color):
+    return QBrush(QColor(*color))
+
+
+_scaled_icon_size = None
+
+
+def icon_size():
+    """ The icon size scaled for the UI, which needs a graphical session."""
+
+    global _scaled_icon_size
+    if _scaled_icon_size is None:
+        _scaled_icon_size = hou.ui.scaledSize(const.ICON_SIZE)
+
+    return _scaled_icon_size
+
+
+# Icons keyed by the icon name of the node types.
+ICON_CACHE = ResourceCache(_create_icon, const.ICON_CACHE_SIZE)
+
+# Brushes keyed by the color tuples.
+BRUSH_CACHE = ResourceCache(_create_brush, const.BRUSH_CACHE_SIZE)
@@ -0,0 +1,328 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections import namedtuple, OrderedDict
+
+import hou
+
+from . import constants as const
+from . import matchers
+from .scene_watcher import SCENE_WATCHER
+
+FileParmEntry = namedtuple('FileParmEntry',
+                           ['parm_name', 'parm_label', 'file_type',
+                            'raw_value', 'visible'])
+
+
+class NodeEntry:
+    """ The indexed data of a node and its file reference parms."""
+
+    def __init__(self, path, name, type_name, file_parms):
+        self.path = path
+        self.name = name
+        self.type_name = type_name
+        self.file_parms = file_parms
+
+    def parm_paths(self):
+        return ['{}/{}'.format(self.path, p.parm_name)
+                for p in self.file_parms]
+
+    def match_file_parms(self, parm_pattern, file_type, match_invisible=False,
+                         ignore_case=True):
+        """
+        Returns the file parms of the file type with names or labels
+        matching the parm pattern, a Houdini multi name pattern. A file type
+        of '*' matches all the file types.
+        """
+
+        file_parms = []
+        for parm in self.file_parms:
+            if file_type != '*' and parm.file_type != file_type:
+                continue
+            if not match_invisible and not parm.visible:
+                continue
+            if hou.patternMatch(parm_pattern, parm.parm_name, ignore_case) or \
+                    hou.patternMatch(parm_pattern, parm.parm_label,
+                                     ignore_case):
+                file_parms.append(parm)
+
+        return file_parms
+
+
+def get_file_parm_entries(node):
+    """ Returns a FileParmEntry for every file reference parm of the node."""
+
+    # The file types are cached by node type.
+    type_key = matchers.node_type_key(node)
+
+    entries = []
+    for parm in node.parms():
+        file_type = matchers.parm_file_type(parm, type_key)
+        if not file_type:
+            continue
+
+        entries.append(FileParmEntry(parm.name(), parm.description(),
+                                     file_type, parm.rawValue(),
+                                     parm.isVisible()))
+
+    return entries
+
+
+def make_node_entry(node):
+    """ Returns the NodeEntry of a node, or None if it has no file parms."""
+
+    file_parms = get_file_parm_entries(node)
+    if not file_parms:
+        return None
+
+    return NodeEntry(node.path(), node.name(), node.type().name(),
+                     file_parms)
+
+
+def _is_under(path, dirty_paths):
+    """ Returns True if the path or any of its ancestors is in dirty_paths."""
+
+    while path:
+        if path in dirty_paths:
+            return True
+        path = path.rpartition(const.PATH_DELIMITER)[0]
+
+    return False
+
+
+class FileParmIndex:
+    """
+    Index of all the nodes with file reference parms in the scene.
+
+    The scene is scanned once, and then kept current by the scene watcher:
+    created, deleted and renamed nodes mark their sub-trees dirty, and
+    changed parms mark their nodes dirty. The dirty parts are re-scanned on
+    the next query, so filtering is an in-memory query.
+    """
+
+    def __init__(self, watcher=SCENE_WATCHER):
+        # node path -> NodeEntry, only for nodes with file reference parms.
+        self._nodes = {}
+        self._built = False
+        self._building = False
+
+        self._watcher = watcher
+
+        # The MatcherPipeline of the last query.
+        self.last_pipeline = None
+
+        # Query arguments -> node paths, cleared when the index changes.
+        self._query_cache = OrderedDict()
+        self.query_cache_size = const.QUERY_CACHE_SIZE
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+
+        # The file types of the entries change with the HDA definitions.
+        matchers.PARM_FILE_TYPE_CACHE.add_listener(
+            self._on_file_types_changed)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def is_built(self):
+        return self._built
+
+    def is_building(self):
+        return self._building
+
+    def invalidate(self):
+        """ Drop everything, the scene will be scanned on the next query."""
+
+        self._watcher.remove_callbacks()
+        self._nodes.clear()
+        self._query_cache.clear()
+        self._built = False
+        self._building = False
+
+    def build(self):
+        for _ in self.build_iter():
+            pass
+
+    def build_iter(self):
+        """
+        Build the index one node at a time, yielding (done, total, entry)
+        after each node, where entry is the NodeEntry of the node or None.
+        While it runs, queries use the nodes indexed so far. If it is closed
+        before the end, the index is partial and must be invalidated.
+        """
+
+        self.invalidate()
+
+        # Queries don't build the index from now on, even if the iterator
+        # has not started yet.
+        self._building = True
+        return self._build_iter()
+
+    def _build_iter(self):
+        try:
+            root_node = hou.node(const.PATH_DELIMITER)
+            nodes = (root_node, ) + root_node.allSubChildren(
+                recurse_in_locked_nodes=False)
+
+            total = len(nodes)
+            for done, node in enumerate(nodes, 1):
+                try:
+                    self._index_node(node)
+                except hou.ObjectWasDeleted:
+                    yield done, total, None
+                    continue
+
+                yield done, total, self._nodes.get(node.path())
+
+            self._built = True
+        finally:
+            self._building = False
+
+    def update(self):
+        """ Build the index, or re-scan its dirty parts."""
+
+        # Partial results while the index is being built.
+        if self._building:
+            return
+
+        if not self._built:
+            self.build()
+            return
+
+        dirty_subtrees, dirty_nodes = self._watcher.take_changes()
+
+        # Any change of the scene may change the results.
+        if dirty_subtrees or dirty_nodes:
+            self._query_cache.clear()
+
+        if dirty_subtrees:
+            for path in [p for p in self._nodes
+                         if _is_under(p, dirty_subtrees)]:
+                del self._nodes[path]
+
+            for path in dirty_subtrees:
+                node = hou.node(path)
+                if node:
+                    self._index_subtree(node)
+
+        if dirty_nodes:
+            for path in dirty_nodes:
+                self._nodes.pop(path, None)
+                node = hou.node(path)
+                if node:
+                    self._index_node(node)
+
+    def entry(self, path):
+        return self._nodes.get(path)
+
+    def entries(self, root_path):
+        """ Returns the entries of the nodes under the root path."""
+
+        self.update()
+
+        prefix = root_path.rstrip(const.PATH_DELIMITER) + const.PATH_DELIMITER
+        return [e for p, e in self._nodes.items() if p.startswith(prefix)]
+
+    def query(self, root_path, name_pattern, type_pattern, parm_pattern,
+              file_type, match_invisible=False, ignore_case=True):
+        """
+        Returns the paths of the nodes under the root path with names and
+        types matching the patterns, and with any file parm matching the parm
+        pattern and file type. Patterns are Houdini multi name patterns.
+        """
+
+        file_type = file_type.lower()
+        if file_type not in matchers.FILE_TYPE_DICT.keys():
+            raise Exception('The file type is not supported: {}'
+                            .format(file_type))
+
+        # Recent queries are cached until the scene changes.
+        self.update()
+        key = (root_path, name_pattern, type_pattern, parm_pattern,
+               file_type, match_invisible, ignore_case)
+        path_list = self._query_cache.get(key)
+        if path_list is not None:
+            self.query_cache_hits += 1
+            self._query_cache.move_to_end(key)
+            return list(path_list)
+
+        self.query_cache_misses += 1
+
+        # Cheap name and type stages first. The last pipeline is kept for
+        # its statistics.
+        self.last_pipeline = matchers.node_entry_pipeline(
+            name_pattern, type_pattern, parm_pattern, file_type,
+            match_invisible, ignore_case)
+
+        path_list = [entry.path for entry in
+                     self.last_pipeline.filter(self.entries(root_path))]
+
+        if self._built:
+            self._query_cache[key] = path_list
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+
+        return list(path_list)
+
+    def _on_file_types_changed(self, node_types):
+        """
+        Re-scan the instances of the node types on the next query, or the
+        whole scene if node_types is None.
+        """
+
+        self._query_cache.clear()
+        if not self._built and not self._building:
+            return
+
+        if node_types is None:
+            root_node = hou.node(const.PATH_DELIMITER)
+            self._watcher.mark_dirty(
+                subtrees=[n.path() for n in root_node.children()])
+            return
+
+        # The contents of locked HDAs are not indexed.
+        nodes = []
+        for node_type in node_types:
+            nodes.extend(n.path() for n in node_type.instances()
+                         if not n.isInsideLockedHDA())
+        self._watcher.mark_dirty(nodes=nodes)
+
+    def _index_node(self, node):
+        entry = make_node_entry(node)
+        if entry:
+            self._nodes[entry.path] = entry
+            self._watcher.watch(node, (hou.nodeEventType.ParmTupleChanged,
+                                       hou.nodeEventType.NameChanged))
+
+        if node.isNetwork():
+            self._watcher.watch(node, (hou.nodeEventType.ChildCreated,
+                                       hou.nodeEventType.ChildDeleted,
+                                       hou.nodeEventType.NameChanged))
+
+    def _index_subtree(self, root_node):
+        self._index_node(root_node)
+        for node in root_node.allSubChildren(recurse_in_locked_nodes=False):
+            self._index_node(node)
+
+
+# The index shared by all the browsers.
+SCENE_INDEX = FileParmIndex()
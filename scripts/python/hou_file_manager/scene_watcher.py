@@ -0,0 +1,138 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hou
+
+from . import constants as const
+
+
+class SceneWatcher:
+    """
+    Owner of the node event callbacks of the file manager.
+
+    Every watched node has one callback, which records the changes of the
+    scene as dirty sub-trees and dirty nodes for the scene index, and then
+    passes the event on to the listeners, like the models and the browsers.
+    The listeners are expected to be cheap, and to defer any real work.
+    """
+
+    def __init__(self):
+        # node session id -> (node, event types)
+        self._watched = {}
+
+        self._listeners = []
+
+        self._dirty_subtrees = set()
+        self._dirty_nodes = set()
+
+    def __len__(self):
+        return len(self._watched)
+
+    def watch(self, node, event_types):
+        session_id = node.sessionId()
+        watched = self._watched.get(session_id)
+        if watched:
+            event_types = tuple(t for t in event_types
+                                if t not in watched[1])
+            if not event_types:
+                return
+            watched[1].extend(event_types)
+        else:
+            self._watched[session_id] = (node, list(event_types))
+
+        node.addEventCallback(event_types, self._on_node_event)
+
+    def remove_callbacks(self):
+        """ Remove all the callbacks, and forget the recorded changes."""
+
+        for node, event_types in self._watched.values():
+            try:
+                node.removeEventCallback(tuple(event_types),
+                                         self._on_node_event)
+            except hou.ObjectWasDeleted:
+                pass
+            except hou.OperationFailed:
+                pass
+
+        self._watched.clear()
+        self._dirty_subtrees.clear()
+        self._dirty_nodes.clear()
+
+    def add_listener(self, listener):
+        """ listener(event_type, **kwargs) is called for every event."""
+
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def has_listeners(self):
+        return bool(self._listeners)
+
+    def mark_dirty(self, subtrees=(), nodes=()):
+        """ Record changes which don't come from node events."""
+
+        self._dirty_subtrees.update(subtrees)
+        self._dirty_nodes.update(nodes)
+
+    def take_changes(self):
+        """
+        Returns (dirty sub-tree paths, dirty node paths) recorded since the
+        last call.
+        """
+
+        changes = self._dirty_subtrees, self._dirty_nodes
+        self._dirty_subtrees = set()
+        self._dirty_nodes = set()
+
+        return changes
+
+    def _on_node_event(self, event_type, **kwargs):
+        node = kwargs.get('node')
+
+        if event_type == hou.nodeEventType.ChildCreated:
+            self._dirty_subtrees.add(kwargs['child_node'].path())
+
+        elif event_type == hou.nodeEventType.ChildDeleted:
+            child = kwargs['child_node']
+            self._dirty_subtrees.add(child.path())
+            self._watched.pop(child.sessionId(), None)
+
+        elif event_type == hou.nodeEventType.NameChanged:
+            old_name = kwargs.get('old_name')
+            if old_name:
+                self._dirty_subtrees.add('{}/{}'.format(
+                    node.parent().path().rstrip(const.PATH_DELIMITER),
+                    old_name))
+            self._dirty_subtrees.add(node.path())
+
+        elif event_type == hou.nodeEventType.ParmTupleChanged:
+            self._dirty_nodes.add(node.path())
+
+        for listener in list(self._listeners):
+            listener(event_type, **kwargs)
+
+
+# The watcher shared by the scene index and all the browsers.
+SCENE_WATCHER = SceneWatcher()
@@ -0,0 +1,123 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+
+from PySide2.QtCore import QObject, QTimer
+
+from . import constants as const
+
+
+class DebouncedScheduler(QObject):
+    """ Runs a callback once a burst of requests has settled."""
+
+    def __init__(self, callback, interval, parent=None):
+        super().__init__(parent)
+
+        self._callback = callback
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def is_pending(self):
+        return self._timer.isActive()
+
+    def request(self):
+        """ Run the callback after the interval, restarting the wait."""
+
+        self._timer.start()
+
+    def cancel(self):
+        """ Drop the pending request."""
+        self._timer.stop()
+
+    def _on_timeout(self):
+        self._callback()
+
+
+class TimeSlicedTask(QObject):
+    """
+    Runs an iterator from the event loop, in slices of budget milliseconds,
+    so the work stays in the main thread without freezing the UI.
+    on_slice(items) is called with the items yielded by each slice, and
+    on_finished() when the iterator is exhausted.
+    """
+
+    def __init__(self, iterator, on_slice, on_finished=None,
+                 budget_ms=const.SCAN_SLICE_MS, parent=None):
+        super().__init__(parent)
+
+        self._iterator = iterator
+        self._on_slice = on_slice
+        self._on_finished = on_finished
+        self._budget = budget_ms / 1000.0
+        self._running = False
+
+        # Run the next slice once the pending events are processed.
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._run_slice)
+
+    def is_running(self):
+        return self._running
+
+    def start(self):
+        self._running = True
+        self._timer.start()
+
+    def cancel(self):
+        """ Stop and close the iterator, on_finished is not called."""
+
+        self._running = False
+        self._timer.stop()
+        if hasattr(self._iterator, 'close'):
+            self._iterator.close()
+
+    def _run_slice(self):
+        if not self._running:
+            return
+
+        items = []
+        finished = False
+        deadline = time.perf_counter() + self._budget
+        try:
+            while time.perf_counter() < deadline:
+                items.append(next(self._iterator))
+        except StopIteration:
+            finished = True
+        except Exception:
+            self._running = False
+            raise
+
+        if finished:
+            self._running = False
+
+        self._on_slice(items)
+
+        if finished:
+            if self._on_finished:
+                self._on_finished()
+        elif self._running:
+            self._timer.start()
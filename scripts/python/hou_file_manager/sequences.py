@@ -0,0 +1,228 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import re
+
+from .fscache import DIR_CACHE
+
+# $F, $F4, ${F} or ${F4}, but not $FPS, $FSTART etc.
+FRAME_TOKEN_RE = re.compile(r'\$(?:F([0-9]*)(?![A-Za-z_])|\{F([0-9]*)\})')
+
+_DIGITS_RE = re.compile(r'[0-9]+')
+
+# A frame number in an evaluated basename, which may be negative.
+_FRAME_RE = re.compile(r'-?[0-9]+')
+
+
+def parse_frame_token(basename):
+    """
+    Split a raw basename with a frame token like $F4 into
+    (prefix, padding, suffix). Returns None if there is no frame token.
+    """
+
+    # Backtick or () are not supported.
+    if '`' in basename or '(' in basename or ')' in basename:
+        return None
+
+    result = FRAME_TOKEN_RE.search(basename)
+    if not result:
+        return None
+
+    # Houdini doesn't pad $F, which is the same as padding of 1.
+    padding = int(result.group(1) or result.group(2) or 1)
+
+    return (basename[:result.start()], max(1, padding),
+            basename[result.end():])
+
+
+class FrameSequence:
+    """ Sorted frame numbers of files named prefix + frame + suffix."""
+
+    def __init__(self, dirname, prefix, padding, suffix, frames):
+        self.dirname = dirname
+        self.prefix = prefix
+        self.padding = padding
+        self.suffix = suffix
+        self.frames = frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __repr__(self):
+        return ('<{} {}{}{} {}>'
+                .format(type(self).__name__, self.prefix,
+                        '#' * self.padding, self.suffix, self.describe()))
+
+    def file_name(self, frame):
+        # The padding is the number of digits, without the sign.
+        sign = '-' if frame < 0 else ''
+        return '{}{}{}{}'.format(self.prefix, sign,
+                                 str(abs(frame)).zfill(self.padding),
+                                 self.suffix)
+
+    def file_paths(self):
+        return [os.path.join(self.dirname, self.file_name(f))
+                for f in self.frames]
+
+    def frame_range(self):
+        """ Returns (first, last) or None if the sequence is empty."""
+        if not self.frames:
+            return None
+
+        return self.frames[0], self.frames[-1]
+
+    def missing_count(self):
+        if not self.frames:
+            return 0
+
+        return self.frames[-1] - self.frames[0] + 1 - len(self.frames)
+
+    def missing_frames(self):
+        """ Returns the list of holes in the frame range."""
+        missing = []
+        for prev, cur in zip(self.frames, self.frames[1:]):
+            missing.extend(range(prev + 1, cur))
+
+        return missing
+
+    def describe(self):
+        if not self.frames:
+            return 'no frames'
+
+        first, last = self.frame_range()
+        desc = 'frames {}-{}'.format(first, last)
+
+        missing = self.missing_count()
+        if missing:
+            desc += ', {} missing'.format(missing)
+
+        return desc
+
+
+class SequenceIndex:
+    """
+    All the frame sequences of a directory, parsed in one pass like lsseq.
+
+    Every run of digits in a file name is taken as a possible frame number,
+    so a file name is indexed once per run of digits. The files are grouped
+    by (prefix, padding, suffix), where padding is the number of digits.
+    A run of digits after a '-' is also indexed as a negative frame, with
+    the '-' left out of the prefix.
+    """
+
+    def __init__(self, names):
+        # (prefix, padding, suffix) -> list of frames
+        self._groups = {}
+
+        # (prefix, suffix) -> set of paddings
+        self._paddings = {}
+
+        for name in names:
+            for result in _DIGITS_RE.finditer(name):
+                digits = result.group()
+                prefix = name[:result.start()]
+                suffix = name[result.end():]
+                self._add(prefix, len(digits), suffix, int(digits))
+                if prefix.endswith('-'):
+                    self._add(prefix[:-1], len(digits), suffix,
+                              -int(digits))
+
+        for frames in self._groups.values():
+            frames.sort()
+
+    def _add(self, prefix, padding, suffix, frame):
+        self._groups.setdefault((prefix, padding, suffix), []).append(frame)
+        self._paddings.setdefault((prefix, suffix), set()).add(padding)
+
+    def keys(self):
+        return self._groups.keys()
+
+    def frames(self, prefix, padding, suffix) -> list:
+        """
+        Returns the sorted frames Houdini would use for prefix + $F<padding>
+        + suffix. Frames with more digits than the padding are included as
+        long as they are not zero padded, like frame 10000 for $F4.
+        """
+
+        frames = list(self._groups.get((prefix, padding, suffix), ()))
+
+        longer_paddings = [p for p in self._paddings.get((prefix, suffix), ())
+                           if p > padding]
+        if not longer_paddings:
+            return frames
+
+        for g_padding in longer_paddings:
+            min_frame = 10 ** (g_padding - 1)
+            frames.extend(f for f in self._groups[(prefix, g_padding, suffix)]
+                          if abs(f) >= min_frame)
+
+        frames.sort()
+        return frames
+
+    def find(self, dirname, prefix, padding, suffix) -> FrameSequence:
+        return FrameSequence(dirname, prefix, padding, suffix,
+                             self.frames(prefix, padding, suffix))
+
+
+def _expand_prefix_suffix(prefix, suffix, eval_basename):
+    """
+    Get the expanded prefix and suffix from the evaluated basename, in case
+    the raw ones have variables like $HIPNAME. Only one of them may have
+    variables, otherwise the raw ones are returned.
+    """
+
+    if '$' not in prefix and eval_basename.startswith(prefix):
+        result = _FRAME_RE.match(eval_basename, len(prefix))
+        if result:
+            return prefix, eval_basename[result.end():]
+
+    elif '$' not in suffix and eval_basename.endswith(suffix):
+        head = eval_basename[:len(eval_basename) - len(suffix)]
+        result = re.search('-?[0-9]+$', head)
+        if result:
+            return head[:result.start()], suffix
+
+    return prefix, suffix
+
+
+def get_sequence_index(dirname, cache=DIR_CACHE) -> SequenceIndex:
+    """ Returns the cached sequence index of the directory."""
+    return cache.get_derived(dirname, SequenceIndex, SequenceIndex)
+
+
+def resolve_sequence(raw_value, eval_value, cache=DIR_CACHE):
+    """
+    Returns the FrameSequence of a raw file path with a frame token,
+    or None if the raw file path is not a supported sequence.
+    """
+
+    token = parse_frame_token(os.path.basename(raw_value))
+    if not token:
+        return None
+
+    prefix, padding, suffix = token
+    dirname, eval_basename = os.path.split(eval_value)
+    prefix, suffix = _expand_prefix_suffix(prefix, suffix, eval_basename)
+
+    return get_sequence_index(dirname, cache).find(dirname, prefix, padding,
+                                                   suffix)
@@ -0,0 +1,188 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import re
+from collections import namedtuple
+from functools import partial
+
+from .fscache import DIR_CACHE
+
+# Token -> (group name, regex of the group)
+# <UDIM> and %(UDIM)d: 1001, 1002 ...
+# <UVTILE>: Mudbox style u1_v1, 1-based.
+# <U>, <V>, %(U)d and %(V)d: ZBrush style _u0_v0, 0-based.
+TILE_TOKENS = {
+    '<UDIM>': ('udim', '[1-9][0-9]{3}'),
+    '%(UDIM)d': ('udim', '[1-9][0-9]{3}'),
+    '<UVTILE>': ('uvtile', 'u[1-9][0-9]*_v[1-9][0-9]*'),
+    '<U>': ('u', '[0-9]+'),
+    '<V>': ('v', '[0-9]+'),
+    '%(U)d': ('u', '[0-9]+'),
+    '%(V)d': ('v', '[0-9]+'),
+}
+
+# Group name -> glob pattern of the group, for tokens in directory names.
+TILE_GROUP_GLOBS = {
+    'udim': '[1-9][0-9][0-9][0-9]',
+    'uvtile': 'u[1-9]*_v[1-9]*',
+    'u': '[0-9]*',
+    'v': '[0-9]*',
+}
+
+_TILE_TOKEN_RE = re.compile('|'.join(re.escape(t) for t in TILE_TOKENS))
+
+# u and v are 0-based.
+Tile = namedtuple('Tile', ['udim', 'u', 'v', 'name'])
+
+
+def has_tile_token(path):
+    return bool(_TILE_TOKEN_RE.search(path))
+
+
+def tile_glob_pattern(path):
+    """ Replace the tile tokens of a path with glob patterns."""
+    return _TILE_TOKEN_RE.sub(
+        lambda result: TILE_GROUP_GLOBS[TILE_TOKENS[result.group()][0]],
+        path)
+
+
+def udim_to_uv(udim):
+    return (udim - 1001) % 10, (udim - 1001) // 10
+
+
+def uv_to_udim(u, v):
+    return 1001 + u + 10 * v
+
+
+def tile_pattern_re(basename):
+    """
+    Convert a basename with tile tokens into a regex with named groups.
+    The same token used more than once must match the same value.
+    """
+
+    parts = ['^']
+    used_groups = set()
+    pos = 0
+    for result in _TILE_TOKEN_RE.finditer(basename):
+        parts.append(re.escape(basename[pos:result.start()]))
+
+        group, group_re = TILE_TOKENS[result.group()]
+        if group in used_groups:
+            parts.append('(?P={})'.format(group))
+        else:
+            parts.append('(?P<{}>{})'.format(group, group_re))
+            used_groups.add(group)
+
+        pos = result.end()
+
+    parts.append(re.escape(basename[pos:]))
+    parts.append('$')
+
+    return re.compile(''.join(parts))
+
+
+def _match_to_tile(result, name):
+    """ Returns the Tile of a matched name, or None if it is not valid."""
+
+    groups = result.groupdict()
+
+    if groups.get('udim'):
+        udim = int(groups['udim'])
+        if udim < 1001:
+            return None
+        u, v = udim_to_uv(udim)
+        return Tile(udim, u, v, name)
+
+    if groups.get('uvtile'):
+        u_str, v_str = groups['uvtile'][1:].split('_v')
+        u, v = int(u_str) - 1, int(v_str) - 1
+    else:
+        u, v = int(groups.get('u') or 0), int(groups.get('v') or 0)
+
+    # UDIMs have 10 tiles per row.
+    if u > 9:
+        return None
+
+    return Tile(uv_to_udim(u, v), u, v, name)
+
+
+class TileSet:
+    """ The tiles found in a directory for a basename with tile tokens."""
+
+    def __init__(self, dirname, basename, tiles):
+        self.dirname = dirname
+        self.basename = basename
+        self.tiles = tiles
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __repr__(self):
+        return ('<{} {} {}>'
+                .format(type(self).__name__, self.basename, self.describe()))
+
+    def udims(self):
+        return [t.udim for t in self.tiles]
+
+    def file_paths(self):
+        return [os.path.join(self.dirname, t.name) for t in self.tiles]
+
+    def describe(self):
+        if not self.tiles:
+            return 'no tiles'
+
+        return '{} tile(s) {}-{}'.format(len(self.tiles),
+                                         self.tiles[0].udim,
+                                         self.tiles[-1].udim)
+
+
+def _find_tiles(basename, names):
+    pattern_re = tile_pattern_re(basename)
+
+    tiles = []
+    for name in names:
+        result = pattern_re.match(name)
+        tile = _match_to_tile(result, name) if result else None
+        if tile:
+            tiles.append(tile)
+
+    tiles.sort()
+    return tiles
+
+
+def resolve_tiles(eval_value, cache=DIR_CACHE):
+    """
+    Returns the TileSet of an evaluated file path with tile tokens, or None
+    if the path has no tile tokens in its basename. Tokens in the directory
+    part are not supported.
+    """
+
+    dirname, basename = os.path.split(eval_value)
+    if not has_tile_token(basename) or has_tile_token(dirname):
+        return None
+
+    # Parms with the same basename pattern share the result.
+    tiles = cache.get_derived(dirname, ('tiles', basename),
+                              partial(_find_tiles, basename))
+
+    return TileSet(dirname, basename, tiles)
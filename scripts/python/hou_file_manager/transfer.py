@@ -0,0 +1,722 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import json
+import shutil
+import stat
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows.
+    fcntl = None
+
+from . import constants as const
+
+# ioctl request for cloning a file on Linux (Btrfs, XFS etc.)
+FICLONE = 0x40049409
+
+
+def same_device(s_file, dest_dir):
+    try:
+        return os.stat(s_file).st_dev == os.stat(dest_dir).st_dev
+    except OSError:
+        return False
+
+
+def reflink_file(s_file, target_file):
+    """
+    Clone the source file into the target file, so they share the data
+    blocks until one of them is changed. Raises OSError when the file
+    system doesn't support it.
+    """
+
+    if fcntl is None:
+        raise OSError('Reflink is not supported on this platform.')
+
+    with open(s_file, 'rb') as src, open(target_file, 'xb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(target_file)
+            raise
+
+    shutil.copystat(s_file, target_file)
+
+
+def link_file(s_file, target_file):
+    """
+    Link the target file to the source file without copying the data.
+    Tries hardlink, reflink and then symlink. Returns the kind of link made.
+    """
+
+    try:
+        os.link(s_file, target_file)
+        return 'hardlink'
+    except OSError:
+        pass
+
+    try:
+        reflink_file(s_file, target_file)
+        return 'reflink'
+    except OSError:
+        pass
+
+    os.symlink(os.path.abspath(s_file), target_file)
+    return 'symlink'
+
+
+def partial_file_path(target_file):
+    """ The temporary file a target file is written to before it is done."""
+    dirname, basename = os.path.split(target_file)
+    return os.path.join(dirname, '.{}{}'.format(basename,
+                                                const.TRANSFER_PARTIAL_SUFFIX))
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+def _no_emit(kind, s_file, target_file, size=0, message=''):
+    pass
+
+
+def _copy_data(s_file, target_file, partial_file, emit, cancel_event):
+    """ Copy the data in chunks, reporting the bytes copied."""
+
+    with open(s_file, 'rb') as src, open(partial_file, 'wb') as dst:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise TransferCancelled()
+
+            chunk = src.read(const.TRANSFER_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            dst.write(chunk)
+            emit(const.TRANSFER_EVENT_BYTES, s_file, target_file, len(chunk))
+
+    shutil.copymode(s_file, partial_file)
+
+
+def copy_file(s_file, target_file, emit=_no_emit, cancel_event=None):
+    """
+    Copy the source file to a partial file first, and then rename it to the
+    target file, so the target file is never incomplete.
+    """
+
+    partial_file = partial_file_path(target_file)
+
+    # Remove the leftover of a previous run.
+    if os.path.lexists(partial_file):
+        os.remove(partial_file)
+
+    try:
+        # A reflink is a copy which shares the data blocks until
+        # changed, so try it first on the same file system.
+        reflinked = False
+        if same_device(s_file, os.path.dirname(target_file)):
+            try:
+                reflink_file(s_file, partial_file)
+                reflinked = True
+                emit(const.TRANSFER_EVENT_BYTES, s_file, target_file,
+                     os.path.getsize(partial_file))
+            except OSError:
+                pass
+
+        if not reflinked:
+            _copy_data(s_file, target_file, partial_file, emit, cancel_event)
+
+        os.replace(partial_file, target_file)
+    except BaseException:
+        if os.path.lexists(partial_file):
+            os.remove(partial_file)
+        raise
+
+
+class TransferJournal:
+    """
+    Manifest of the files completed in a destination directory.
+
+    The source path and the size and mtime of each completed target file
+    and of its source file are stored in a json file in the destination
+    directory, so a rerun of an interrupted batch can skip the files
+    verified complete, even if their sources were moved away.
+    """
+
+    def __init__(self, dest_dir):
+        self.dest_dir = dest_dir
+        self.manifest_path = os.path.join(dest_dir,
+                                          const.TRANSFER_MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._unflushed = 0
+
+        # basename -> {'source': str, 'size': int, 'mtime': int,
+        #              'source_size': int, 'source_mtime': int}
+        self._entries = {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                self._entries = json.load(f).get('files', {})
+        except (IOError, OSError, ValueError):
+            pass
+
+    def _get_entry(self, target_file):
+        with self._lock:
+            return self._entries.get(os.path.basename(target_file))
+
+    def has(self, target_file):
+        return self._get_entry(target_file) is not None
+
+    def get_source(self, target_file):
+        entry = self._get_entry(target_file)
+        return entry.get('source') if entry else None
+
+    def is_target_unchanged(self, target_file):
+        """ Returns True if the target file is still the one recorded."""
+
+        entry = self._get_entry(target_file)
+        if not entry:
+            return False
+
+        try:
+            st = os.stat(target_file)
+        except OSError:
+            return False
+
+        return (st.st_size == entry['size'] and
+                st.st_mtime_ns == entry['mtime'])
+
+    def is_recorded_source(self, target_file, s_file):
+        """
+        Returns True if the target file was transferred from the source
+        file, and the source file, if it still exists, hasn't changed since.
+        """
+
+        entry = self._get_entry(target_file)
+        if not entry or entry.get('source') != s_file:
+            return False
+
+        # Moved away by a previous run.
+        try:
+            st = os.stat(s_file)
+        except OSError:
+            return True
+
+        return (st.st_size == entry.get('source_size') and
+                st.st_mtime_ns == entry.get('source_mtime'))
+
+    def is_complete(self, target_file, s_file):
+        """
+        Returns True if the target file is the one recorded, transferred
+        from the source file.
+        """
+
+        return (self.is_recorded_source(target_file, s_file) and
+                self.is_target_unchanged(target_file))
+
+    def record(self, s_file, target_file, source_stat, flush=False):
+        """
+        Record a completed target file, where source_stat is the os.stat
+        result of the source file before it was transferred. The manifest
+        is written every few records, or right away if flush is True.
+        """
+
+        st = os.stat(target_file)
+        with self._lock:
+            self._entries[os.path.basename(target_file)] = {
+                'source': s_file, 'size': st.st_size,
+                'mtime': st.st_mtime_ns,
+                'source_size': source_stat.st_size,
+                'source_mtime': source_stat.st_mtime_ns}
+            self._unflushed += 1
+            flush = flush or \
+                self._unflushed >= const.TRANSFER_JOURNAL_FLUSH_COUNT
+
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """ Write the manifest atomically."""
+
+        with self._lock:
+            if not self._unflushed:
+                return
+            data = json.dumps({'files': self._entries}, indent=1)
+            self._unflushed = 0
+
+            partial_file = partial_file_path(self.manifest_path)
+            try:
+                with open(partial_file, 'w') as f:
+                    f.write(data)
+                os.replace(partial_file, self.manifest_path)
+            except (IOError, OSError) as e:
+                print('Failed to write the transfer manifest:\n'
+                      '  {}\n'
+                      '  Error: {}'
+                      .format(self.manifest_path, e))
+
+
+def transfer_file(s_file, file_action, dest_dir, journal=None,
+                  emit=_no_emit, cancel_event=None):
+    """
+    Copy, move or link a single file into dest_dir. The progress is reported
+    by calling emit(kind, s_file, target_file, size, message).
+    Returns True if the file is in the destination directory afterwards.
+    """
+
+    target_file = os.path.join(dest_dir, os.path.basename(s_file))
+
+    if cancel_event is not None and cancel_event.is_set():
+        emit(const.TRANSFER_EVENT_FAILED, s_file, target_file,
+             message='Cancelled.')
+        return False
+
+    # Completed by a previous run. It is checked first, as the sources of
+    # the files moved by a previous run are gone.
+    if journal and journal.is_complete(target_file, s_file):
+        emit(const.TRANSFER_EVENT_SKIPPED, s_file, target_file,
+             os.path.getsize(target_file), 'Already transferred.')
+        return True
+
+    try:
+        source_stat = os.stat(s_file)
+    except OSError:
+        source_stat = None
+    if source_stat is None or not stat.S_ISREG(source_stat.st_mode):
+        # Moved by a previous run which stopped before it was recorded.
+        if file_action == const.FILE_ACTION_MOVE and source_stat is None \
+                and os.path.isfile(target_file) and \
+                not (journal and journal.has(target_file)):
+            emit(const.TRANSFER_EVENT_SKIPPED, s_file, target_file,
+                 os.path.getsize(target_file),
+                 'Already moved, the source file is in destination '
+                 'directory.')
+            return True
+
+        emit(const.TRANSFER_EVENT_FAILED, s_file, target_file,
+             message='The source file does not exist.')
+        return False
+
+    # Check if target file already exists. Target files written by this tool
+    # are always complete because of the partial files, so only the ones
+    # not in the journal are checked against the source file.
+    if os.path.lexists(target_file):
+        if journal and journal.has(target_file):
+            if not journal.is_target_unchanged(target_file):
+                emit(const.TRANSFER_EVENT_FAILED, s_file, target_file,
+                     message='The file in destination directory has changed '
+                             'since it was transferred.')
+                return False
+
+            if journal.get_source(target_file) != s_file:
+                emit(const.TRANSFER_EVENT_FAILED, s_file, target_file,
+                     message='A different file with same name as source '
+                             'file was transferred to destination directory '
+                             'before.')
+                return False
+
+            # Our own copy of an older version of the source file, it is
+            # replaced when the new one is complete.
+        elif os.path.isfile(target_file) and \
+                os.path.getsize(target_file) == os.path.getsize(s_file):
+            emit(const.TRANSFER_EVENT_SKIPPED, s_file, target_file,
+                 os.path.getsize(target_file),
+                 'The file with same name as source file already exists '
+                 'in destination directory.')
+            return True
+        else:
+            emit(const.TRANSFER_EVENT_FAILED, s_file, target_file,
+                 message='A different file with same name as source file '
+                         'already exists in destination directory.')
+            return False
+
+    emit(const.TRANSFER_EVENT_STARTED, s_file, target_file)
+
+    message = ''
+    try:
+        if file_action == const.FILE_ACTION_COPY:
+            copy_file(s_file, target_file, emit, cancel_event)
+        elif file_action == const.FILE_ACTION_MOVE:
+            # Moving on the same device is a single rename. The move is
+            # written to the manifest before the source is removed, so a
+            # rerun finds it.
+            if same_device(s_file, dest_dir):
+                os.replace(s_file, target_file)
+                emit(const.TRANSFER_EVENT_BYTES, s_file, target_file,
+                     os.path.getsize(target_file))
+                if journal:
+                    journal.record(s_file, target_file, source_stat,
+                                   flush=True)
+            else:
+                copy_file(s_file, target_file, emit, cancel_event)
+                if journal:
+                    journal.record(s_file, target_file, source_stat,
+                                   flush=True)
+                os.remove(s_file)
+        elif file_action == const.FILE_ACTION_LINK:
+            # Linked next to the target, then renamed over it.
+            partial_file = partial_file_path(target_file)
+            if os.path.lexists(partial_file):
+                os.remove(partial_file)
+            message = 'Linked ({}).'.format(link_file(s_file, partial_file))
+            os.replace(partial_file, target_file)
+            emit(const.TRANSFER_EVENT_BYTES, s_file, target_file,
+                 os.path.getsize(target_file))
+        else:
+            emit(const.TRANSFER_EVENT_FAILED, s_file, target_file,
+                 message='The file action is not supported: {}'
+                         .format(file_action))
+            return False
+
+        if journal and file_action != const.FILE_ACTION_MOVE:
+            journal.record(s_file, target_file, source_stat)
+    except TransferCancelled:
+        emit(const.TRANSFER_EVENT_FAILED, s_file, target_file,
+             message='Cancelled.')
+        return False
+    except (IOError, OSError) as e:
+        emit(const.TRANSFER_EVENT_FAILED, s_file, target_file,
+             message='Failed to {}: {}'.format(file_action, e))
+        return False
+
+    emit(const.TRANSFER_EVENT_DONE, s_file, target_file, message=message)
+    return True
+
+
+def _path_key(path):
+    """ Normalized path used for comparing files of a batch."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+class TransferPlan:
+    """
+    Resolved source files of a whole batch, deduplicated across the jobs.
+
+    Each job is the list of source files of one parm. A source file shared
+    by many jobs is transferred only once. Different source files with the
+    same basename would end up as the same target file, so they are
+    recorded as collisions and none of them is transferred.
+    """
+
+    def __init__(self, dest_dir):
+        self.dest_dir = dest_dir
+
+        # target key -> source file, one item per unique transfer
+        self._transfers = {}
+
+        # target key -> set of colliding source files
+        self._collisions = {}
+
+        # One list of target keys per job
+        self._jobs = []
+
+    def add_job(self, source_files: list) -> int:
+        """ Add the source files of a job. Returns the job id."""
+
+        target_keys = []
+        for s_file in source_files:
+            target_key = _path_key(
+                os.path.join(self.dest_dir, os.path.basename(s_file)))
+            target_keys.append(target_key)
+
+            if target_key in self._collisions:
+                self._collisions[target_key].add(s_file)
+                continue
+
+            claimed_s_file = self._transfers.get(target_key)
+            if claimed_s_file is None:
+                self._transfers[target_key] = s_file
+            elif _path_key(claimed_s_file) != _path_key(s_file):
+                del self._transfers[target_key]
+                self._collisions[target_key] = {claimed_s_file, s_file}
+
+        self._jobs.append(target_keys)
+        return len(self._jobs) - 1
+
+    def jobs(self):
+        return self._jobs
+
+    def transfers(self):
+        """ Returns a dict of target key -> source file."""
+        return self._transfers
+
+    def collisions(self):
+        """ Returns a dict of target key -> set of colliding source files."""
+        return self._collisions
+
+    def file_count(self):
+        return sum(len(target_keys) for target_keys in self._jobs)
+
+    def summary(self):
+        return ('{} parm(s), {} file reference(s), {} unique file(s), '
+                '{} collision(s)'
+                .format(len(self._jobs), self.file_count(),
+                        len(self._transfers), len(self._collisions)))
+
+    def print_collisions(self):
+        for target_key, s_files in self._collisions.items():
+            print('Different source files have the same name in '
+                  'destination directory, none of them will be processed:\n'
+                  '  {}\n'
+                  '    {}'
+                  .format(target_key, '\n    '.join(sorted(s_files))))
+
+
+# kind is one of the const.TRANSFER_EVENT_* values. size is the file size of
+# planned and skipped events, and the number of bytes of bytes events.
+TransferEvent = namedtuple('TransferEvent',
+                           ['kind', 'source', 'target', 'size', 'message'])
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class TransferEngine:
+    """
+    Runs the transfers of a TransferPlan concurrently in a pool of worker
+    threads.
+
+    The engine knows nothing about Houdini. Each unique transfer of the plan
+    runs exactly once, and the result of a job is True only when all of its
+    files have arrived in the destination directory. Completed files are
+    recorded in a TransferJournal, so an interrupted batch can be resumed.
+
+    run_iter() yields lists of TransferEvent at a fixed rate while the
+    transfers run, so a UI can show the progress without being updated
+    once per file.
+    """
+
+    def __init__(self, file_action, dest_dir,
+                 max_workers=const.DEFAULT_TRANSFER_WORKERS):
+        self.file_action = file_action
+        self.dest_dir = dest_dir
+        self.max_workers = max(1, int(max_workers))
+        self.results = []
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """ Stop the batch. Files not yet completed fail."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self, plan: TransferPlan) -> list:
+        """ Returns a list of bool, one per job of the plan."""
+
+        for _ in self.run_iter(plan):
+            pass
+
+        return self.results
+
+    def run_iter(self, plan: TransferPlan,
+                 interval=const.TRANSFER_EVENT_INTERVAL):
+        """
+        Run the plan, yielding the events batched every interval seconds.
+        The results are in self.results when it is exhausted.
+        """
+
+        events = queue.Queue()
+
+        def emit(kind, s_file, target_file, size=0, message=''):
+            events.put(TransferEvent(kind, s_file, target_file, size,
+                                     message))
+
+        def plan_file(s_file):
+            target_file = os.path.join(self.dest_dir, os.path.basename(s_file))
+            emit(const.TRANSFER_EVENT_PLANNED, s_file, target_file,
+                 _file_size(s_file))
+
+        def run_transfer(s_file):
+            # Make sure every file ends with a done, skipped or failed event.
+            try:
+                return transfer_file(s_file, self.file_action, self.dest_dir,
+                                     journal, emit, self._cancel_event)
+            except Exception as e:
+                emit(const.TRANSFER_EVENT_FAILED, s_file,
+                     os.path.join(self.dest_dir, os.path.basename(s_file)),
+                     message='Failed to {}: {}'.format(self.file_action, e))
+                return False
+
+        journal = TransferJournal(self.dest_dir)
+        transfers = plan.transfers()
+        self.results = []
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                # The sizes of the source files are needed for the
+                # progress, stat them in the pool as well.
+                planned = [pool.submit(plan_file, s_file)
+                           for s_file in transfers.values()]
+                for future in planned:
+                    future.result()
+
+                futures = {target_key: pool.submit(run_transfer, s_file)
+                           for target_key, s_file in transfers.items()}
+
+                pending = len(futures)
+                try:
+                    while True:
+                        batch = self._get_event_batch(events, interval)
+                        pending -= sum(
+                            1 for event in batch
+                            if event.kind in (const.TRANSFER_EVENT_DONE,
+                                              const.TRANSFER_EVENT_SKIPPED,
+                                              const.TRANSFER_EVENT_FAILED))
+
+                        # Drain what's left once all the files are done.
+                        if pending <= 0:
+                            while not events.empty():
+                                batch.append(events.get_nowait())
+
+                        if batch or pending > 0:
+                            yield batch
+
+                        if pending <= 0:
+                            break
+                finally:
+                    # Let the workers stop early if the consumer went away.
+                    if pending > 0:
+                        self._cancel_event.set()
+
+                # Colliding targets are not in the futures, so the jobs
+                # referencing them fail.
+                self.results = [bool(target_keys) and
+                                all(target_key in futures and
+                                    futures[target_key].result()
+                                    for target_key in target_keys)
+                                for target_keys in plan.jobs()]
+        finally:
+            journal.flush()
+
+    @staticmethod
+    def _get_event_batch(events, interval):
+        """ Get the events put in the queue during interval seconds."""
+
+        batch = []
+        deadline = time.monotonic() + interval
+        while True:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(events.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        return batch
+
+
+class TransferProgress:
+    """ Accumulates TransferEvents into counters for reporting."""
+
+    def __init__(self):
+        self.total_files = 0
+        self.total_bytes = 0
+        self.done_files = 0
+        self.skipped_files = 0
+        self.failed_files = 0
+        self.done_bytes = 0
+        self.failures = []
+        self._start_time = time.monotonic()
+
+    def update(self, events):
+        for event in events:
+            if event.kind == const.TRANSFER_EVENT_PLANNED:
+                self.total_files += 1
+                self.total_bytes += event.size
+            elif event.kind == const.TRANSFER_EVENT_BYTES:
+                self.done_bytes += event.size
+            elif event.kind == const.TRANSFER_EVENT_DONE:
+                self.done_files += 1
+            elif event.kind == const.TRANSFER_EVENT_SKIPPED:
+                self.skipped_files += 1
+                self.done_bytes += event.size
+            elif event.kind == const.TRANSFER_EVENT_FAILED:
+                self.failed_files += 1
+                self.failures.append(event)
+
+    def processed_files(self):
+        return self.done_files + self.skipped_files + self.failed_files
+
+    def throughput(self):
+        """ Bytes per second."""
+        elapsed = time.monotonic() - self._start_time
+        if elapsed <= 0:
+            return 0.0
+
+        return self.done_bytes / elapsed
+
+    def eta(self):
+        """ Seconds left, or None if unknown."""
+        throughput = self.throughput()
+        if not throughput:
+            return None
+
+        return max(0.0, (self.total_bytes - self.done_bytes) / throughput)
+
+    def percent(self):
+        if self.total_bytes:
+            return min(100, int(100 * self.done_bytes / self.total_bytes))
+        if self.total_files:
+            return int(100 * self.processed_files() / self.total_files)
+
+        return 100
+
+    def text(self):
+        eta = self.eta()
+        return ('{}/{} file(s), {}/{}, {}/s, ETA {}'
+                .format(self.processed_files(), self.total_files,
+                        format_size(self.done_bytes),
+                        format_size(self.total_bytes),
+                        format_size(self.throughput()),
+                        '-' if eta is None else
+                        '{}:{:02d}'.format(int(eta) // 60, int(eta) % 60)))
+
+    def summary(self):
+        return ('{} file(s) done, {} skipped, {} failed.'
+                .format(self.done_files, self.skipped_files,
+                        self.failed_files))
+
+    def print_failures(self):
+        for event in self.failures:
+            print('{}\n  {}'.format(event.message, event.source))
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024:
+            return '{:.1f} {}'.format(size, unit)
+        size /= 1024.0
+
+    return '{:.1f} TB'.format(size)
@@ -23,9 +23,8 @@
 from PySide2.QtCore import QAbstractItemModel
 from PySide2.QtCore import QModelIndex
 from PySide2.QtCore import Qt
-from PySide2.QtGui import QBrush, QColor
-
 from . import constants as const
+from .render_cache import BRUSH_CACHE
 
 
 class BaseTreeItemData:
@@ -82,25 +81,92 @@ class TreeItemDataGenericList(BaseTreeItemData):
 
 
 class TreeItem:
-    def __init__(self, data: BaseTreeItemData, parent: 'TreeItem' = None):
+    def __init__(self, data: BaseTreeItemData, parent: 'TreeItem' = None,
+                 key: str = None):
         self._data = data
         self._parent = parent
         self._children = []
         self._data.tree_item = self
 
+        # The key of the item among its siblings, column 0 data by default.
+        self._key = key
+
+        # key -> child, for finding children without scanning them.
+        self._children_by_key = {}
+
+        # The row of the item in the children of its parent.
+        self._row = 0
+
+    def key(self):
+        if self._key is None:
+            self._key = self.data(0)
+
+        return self._key
+
+    def _add_child_key(self, item: 'TreeItem'):
+        key = item.key()
+        if key and key not in self._children_by_key:
+            self._children_by_key[key] = item
+
+    def _remove_child_key(self, item: 'TreeItem'):
+        key = item.key()
+        if self._children_by_key.get(key) is not item:
+            return
+
+        del self._children_by_key[key]
+
+        # Siblings may share the same key, like parms of different nodes.
+        for child in self._children:
+            if child is not item and child.key() == key:
+                self._children_by_key[key] = child
+                break
+
+    def _update_rows(self, position: int = 0):
+        """ Renumber the rows of the children from the position."""
+        for row in range(max(0, position), len(self._children)):
+            self._children[row]._row = row
+
     def append_child(self, item: 'TreeItem'):
+        item._row = len(self._children)
         self._children.append(item)
         item.set_parent(self)
+        self._add_child_key(item)
+
+    def insert_child(self, position: int, item: 'TreeItem'):
+        self._children.insert(position, item)
+        self._update_rows(position)
+        item.set_parent(self)
+        self._add_child_key(item)
+
+    def insert_children(self, position: int, items: list):
+        """ Insert consecutive items, renumbering the rows only once."""
+        self._children[position:position] = items
+        self._update_rows(position)
+        for item in items:
+            item.set_parent(self)
+            self._add_child_key(item)
+
+    def child_count(self):
+        return len(self._children)
 
     def get_child(self, index: int):
         if index < 0 or index >= len(self._children):
             return None
         return self._children[index]
 
+    def get_child_by_key(self, key: str):
+        if not key:
+            return None
+
+        return self._children_by_key.get(key)
+
     def get_child_by_column_data(self, data: str, column: int = 0):
         if not data:
             return None
 
+        if column == 0:
+            return self.get_child_by_key(data)
+
         for child in self._children:
             child_data = child.data(column)
 
@@ -114,14 +180,23 @@ class TreeItem:
         return self._children
 
     def remove_child(self, item: 'TreeItem'):
-        self.children().remove(item)
+        position = item.get_row_id()
+        if position >= len(self._children) or \
+                self._children[position] is not item:
+            position = self._children.index(item)
+
+        self.remove_children(position, 1)
 
     def remove_children(self, position: int, count: int) -> bool:
         if position < 0 or position + count > len(self.children()):
             return False
 
         for row in range(count):
-            self.children().pop(position)
+            item = self.children().pop(position)
+            self._remove_child_key(item)
+
+        self._update_rows(position)
+        return True
 
     def parent(self):
         return self._parent
@@ -131,7 +206,7 @@ class TreeItem:
 
     def get_row_id(self):
         if self._parent:
-            return self._parent.children().index(self)
+            return self._row
 
         return 0
 
@@ -251,8 +326,7 @@ class BaseTreeModel(QAbstractItemModel):
             # get the original data which is the Hou Node.
             bg_color = item.get_raw_data().get_bg_color()
             if bg_color:
-                brush = QBrush(QColor(*bg_color))
-                return brush
+                return BRUSH_CACHE.get(bg_color)
 
         return None
 
@@ -281,6 +355,38 @@ class BaseTreeModel(QAbstractItemModel):
 
         return success
 
+    def index_of_item(self, item: TreeItem, column: int = 0) -> QModelIndex:
+        if not item or item == self._root_item:
+            return QModelIndex()
+
+        return self.createIndex(item.get_row_id(), column, item)
+
+    def insert_items(self, parent_item: TreeItem, position: int,
+                     items: list):
+        """ Insert consecutive items and notify the views once."""
+
+        self.beginInsertRows(self.index_of_item(parent_item), position,
+                             position + len(items) - 1)
+        parent_item.insert_children(position, items)
+        self.endInsertRows()
+
+    def remove_item(self, item: TreeItem) -> bool:
+        """ Remove an item and notify the views."""
+
+        parent_item = item.parent()
+        if not parent_item:
+            return False
+
+        return self.removeRows(item.get_row_id(), 1,
+                               self.index_of_item(parent_item))
+
+    def item_data_changed(self, item: TreeItem):
+        """ Notify the views that all the columns of the item changed."""
+
+        self.dataChanged.emit(self.index_of_item(item, 0),
+                              self.index_of_item(item,
+                                                 self.columnCount() - 1))
+
     def set_up_model_data(self, data: list):
         raise NotImplementedError
 
@@ -20,97 +20,80 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import os
-import shutil
 import glob
-import re
-from . import constants as const
+from . import sequences
+from . import tiles
+from .transfer import TransferPlan
 
 
-def process_parm_files(parm, file_action, dest_dir):
+def get_parm_file_sequence(parm):
+    """
+    Returns the sequences.FrameSequence of a time-dependent file parm with
+    $F like frame tokens, or None.
+    """
+
+    raw_value = parm.rawValue()
+    if not raw_value or tiles.has_tile_token(raw_value):
+        return None
+
+    return sequences.resolve_sequence(raw_value, parm.eval())
+
+
+def get_parm_file_tiles(parm):
+    """
+    Returns the tiles.TileSet of a file parm with tile tokens like <UDIM>,
+    or None.
+    """
+
+    raw_value = parm.rawValue()
+    if not raw_value or not tiles.has_tile_token(raw_value):
+        return None
+
+    return tiles.resolve_tiles(parm.eval())
+
+
+def get_parm_source_files(parm):
+    """ Resolve the raw value of a file parm into a list of source files."""
+
     source_files = []
 
     raw_value = parm.rawValue()
     eval_value = parm.eval()
 
     if not raw_value:
-        return False
+        return source_files
 
     # Houdini doesn't support time-dependent UDIM texture files.
-    # We will check if the file path contains <UDIM> first.
-    if '<UDIM>' in raw_value:
-        pattern = eval_value.replace('<UDIM>', '[1-9][0-9][0-9][0-9]')
-        source_files = glob.glob(pattern)
+    # We will check if the file path contains tile tokens like <UDIM> first.
+    if tiles.has_tile_token(raw_value):
+        tile_set = tiles.resolve_tiles(eval_value)
+        if tile_set is not None:
+            source_files = tile_set.file_paths()
+        else:
+            # Tokens in the directory part can't be resolved from one listing.
+            source_files = glob.glob(tiles.tile_glob_pattern(eval_value))
 
     elif parm.isTimeDependent():
-        basename = os.path.basename(raw_value)
-
-        # Backtick or () are not supported.
-        if '`' in basename or '(' in basename or ')' in basename:
-            return False
-
-        # Checking for $F4 or ${F4} like substrings.
-        pattern_re = re.compile('\$\{*F[0-9]*\}*')
-        result = pattern_re.search(basename)
-        if not result:
-            return False
-
-        # Get the full basename regex pattern
-        parts = pattern_re.split(basename)
-        full_basename_pattern_re = re.compile(
-            '^' + re.escape(parts[0]) + '[0-9]+' + re.escape(parts[1]) + '$'
-        )
-        dirname = os.path.dirname(eval_value)
-        source_files = [os.path.join(dirname, f)
-                        for f in os.listdir(dirname)
-                        if full_basename_pattern_re.match(f)]
+        sequence = get_parm_file_sequence(parm)
+        if sequence:
+            source_files = sequence.file_paths()
 
     else:
         # Then it is a single file. Eval it which will expand the path.
-        source_files.append(parm.eval())
-
-    # if nothing to process then return
-    if not source_files:
-        print('Nothing to process. Exiting.')
-        return False
-
-    for s_file in source_files:
-        if not os.path.isfile(s_file):
-            print('The source file does not exist: \n  {}'.format(s_file))
-            continue
-
-        # Check if target file already exists.
-        target_file = os.path.join(dest_dir, os.path.basename(s_file))
-        if os.path.isfile(target_file):
-            print('The file with same name as source file already '
-                  'exists in destination directory:\n'
-                  '  {}\n'
-                  'Exiting.'
-                  .format(target_file))
-            continue
-
-        # Then take file action.
-        if file_action == const.FILE_ACTION_COPY:
-            print('Copying source file:\n'
-                  '    {}\n'
-                  '  to destination dir:\n'
-                  '    {}'
-                  .format(s_file, dest_dir))
-            shutil.copy(s_file, dest_dir)
-        elif file_action == const.FILE_ACTION_MOVE:
-            print('Moving source file:\n'
-                  '    {}\n'
-                  '  to destination dir:\n'
-                  '    {}'
-                  .format(s_file, dest_dir))
-            shutil.move(s_file, dest_dir)
-        else:
-            print('The file action is not supported: \n'
-                  '  {}\n'
-                  'Exiting.'
-                  .format(file_action))
+        source_files.append(eval_value)
+
+    return source_files
+
 
-    print('All files have been processed. Done.')
-    return True
+def plan_parms_files(parms, dest_dir):
+    """
+    Resolve all the parms into one transfer.TransferPlan, one job per parm.
+    The hou calls must stay in the main thread, so it is done before any
+    file operations go to the worker threads.
+    """
 
+    plan = TransferPlan(dest_dir)
+    for parm in parms:
+        plan.add_job(get_parm_source_files(parm))
 
+    return plan
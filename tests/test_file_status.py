@@ -0,0 +1,101 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+
+from hou_file_manager import file_status
+from hou_file_manager.file_status import StatusKey
+
+
+def touch(dirname, *names):
+    for name in names:
+        open(os.path.join(str(dirname), name), 'w').close()
+
+
+def check(raw_value, eval_value=None, time_dependent=False):
+    return file_status.check_file_status(
+        StatusKey(raw_value, raw_value if eval_value is None else eval_value,
+                  time_dependent))
+
+
+def test_single_file(tmp_path):
+    touch(tmp_path, 'a.exr')
+
+    assert check(str(tmp_path / 'a.exr')).state == file_status.STATUS_EXISTS
+    assert check(str(tmp_path / 'b.exr')).state == file_status.STATUS_MISSING
+    assert check('').state == file_status.STATUS_EMPTY
+
+
+def test_sequence(tmp_path):
+    touch(tmp_path, 'a.0001.exr', 'a.0003.exr')
+
+    status = check(str(tmp_path / 'a.$F4.exr'), str(tmp_path / 'a.0001.exr'),
+                   time_dependent=True)
+    assert status.state == file_status.STATUS_PARTIAL
+
+    status = check(str(tmp_path / 'b.$F4.exr'), str(tmp_path / 'b.0001.exr'),
+                   time_dependent=True)
+    assert status.state == file_status.STATUS_MISSING
+
+
+def test_tiles(tmp_path):
+    touch(tmp_path, 'a.1001.exr', 'a.1002.exr')
+    for name in ('u1_v1', 'u2_v1'):
+        (tmp_path / name).mkdir()
+        touch(tmp_path / name, 'b.exr')
+
+    status = check(str(tmp_path / 'a.<UDIM>.exr'))
+    assert status.state == file_status.STATUS_TILES
+    assert status.text == '2 UDIM tiles found'
+
+    # Tokens in the directory part are globbed.
+    status = check(str(tmp_path / '<UVTILE>' / 'b.exr'))
+    assert status.state == file_status.STATUS_TILES
+
+
+def test_stat_cache_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(file_status.time, 'monotonic', lambda: now[0])
+
+    cache = file_status.StatCache(ttl=30, max_size=2)
+    key = StatusKey('a.exr', 'a.exr', False)
+    status = file_status.FileStatus(file_status.STATUS_EXISTS, 'exists', '')
+
+    cache.put(key, status)
+    now[0] += 29
+    assert cache.get(key) == status
+
+    now[0] += 2
+    assert cache.get(key) is None
+
+
+def test_submit_status_check(tmp_path):
+    touch(tmp_path, 'a.exr')
+    key = StatusKey(str(tmp_path / 'a.exr'), str(tmp_path / 'a.exr'), False)
+    results = []
+
+    file_status.submit_status_check(
+        key, lambda *args: results.append(args)).result()
+
+    assert results[0][0] == key
+    assert results[0][1].state == file_status.STATUS_EXISTS
+    assert file_status.STAT_CACHE.get(key) == results[0][1]
@@ -0,0 +1,86 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+
+from hou_file_manager.fscache import DirListingCache
+
+
+def touch(path):
+    open(str(path), 'w').close()
+
+
+def set_mtime(path, mtime_ns):
+    os.utime(str(path), ns=(mtime_ns, mtime_ns))
+
+
+def test_listing_is_cached_until_mtime_changes(tmp_path):
+    touch(tmp_path / 'a.exr')
+    (tmp_path / 'sub').mkdir()
+    set_mtime(tmp_path, 1000000000)
+
+    cache = DirListingCache()
+    assert cache.list_files(str(tmp_path)) == ('a.exr', )
+
+    # Same mtime, the cached listing is returned.
+    touch(tmp_path / 'b.exr')
+    set_mtime(tmp_path, 1000000000)
+    assert cache.list_files(str(tmp_path)) == ('a.exr', )
+
+    set_mtime(tmp_path, 2000000000)
+    assert sorted(cache.list_files(str(tmp_path))) == ['a.exr', 'b.exr']
+
+
+def test_derived_is_rebuilt_with_listing(tmp_path):
+    touch(tmp_path / 'a.exr')
+    set_mtime(tmp_path, 1000000000)
+
+    calls = []
+
+    def factory(names):
+        calls.append(names)
+        return len(names)
+
+    cache = DirListingCache()
+    assert cache.get_derived(str(tmp_path), 'count', factory) == 1
+    assert cache.get_derived(str(tmp_path), 'count', factory) == 1
+    assert len(calls) == 1
+
+    touch(tmp_path / 'b.exr')
+    set_mtime(tmp_path, 2000000000)
+    assert cache.get_derived(str(tmp_path), 'count', factory) == 2
+    assert len(calls) == 2
+
+
+def test_missing_directory(tmp_path):
+    cache = DirListingCache()
+    assert cache.list_files(str(tmp_path / 'missing')) == ()
+    assert cache.get_derived(str(tmp_path / 'missing'), 'count', len) == 0
+
+
+def test_lru_size(tmp_path):
+    cache = DirListingCache(max_size=2)
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).mkdir()
+        cache.list_files(str(tmp_path / name))
+
+    assert len(cache) == 2
@@ -0,0 +1,108 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+
+import pytest
+
+QtCore = pytest.importorskip('PySide2.QtCore')
+
+from hou_file_manager.scheduler import (  # noqa: E402
+    DebouncedScheduler, TimeSlicedTask)
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QtCore.QCoreApplication.instance() or \
+        QtCore.QCoreApplication([])
+
+
+def process_events_until(app, condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+
+
+def slow_items(count, seconds):
+    for i in range(count):
+        time.sleep(seconds)
+        yield i
+
+
+def test_slices_stay_in_budget(app):
+    slices = []
+    finished = []
+    task = TimeSlicedTask(slow_items(20, 0.002), slices.append,
+                          lambda: finished.append(True), budget_ms=5)
+    task.start()
+    process_events_until(app, lambda: finished)
+
+    assert finished
+    assert not task.is_running()
+    assert sum(slices, []) == list(range(20))
+    # About 2 items per slice of 5 ms.
+    assert len(slices) > 4
+    assert max(len(items) for items in slices) < 10
+
+
+def test_cancel_closes_iterator(app):
+    closed = []
+
+    def items():
+        try:
+            while True:
+                time.sleep(0.001)
+                yield None
+        finally:
+            closed.append(True)
+
+    slices = []
+    finished = []
+    task = TimeSlicedTask(items(), slices.append,
+                          lambda: finished.append(True), budget_ms=2)
+    task.start()
+    process_events_until(app, lambda: len(slices) >= 2)
+    task.cancel()
+    count = len(slices)
+    process_events_until(app, lambda: False, timeout=0.05)
+
+    assert closed
+    assert not finished
+    assert len(slices) == count
+    assert not task.is_running()
+
+
+def test_debounce(app):
+    calls = []
+    scheduler = DebouncedScheduler(lambda: calls.append(True), 20)
+    for _ in range(5):
+        scheduler.request()
+    assert scheduler.is_pending()
+
+    process_events_until(app, lambda: calls)
+    process_events_until(app, lambda: False, timeout=0.05)
+    assert calls == [True]
+
+    scheduler.request()
+    scheduler.cancel()
+    process_events_until(app, lambda: False, timeout=0.05)
+    assert calls == [True]
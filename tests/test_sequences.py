@@ -0,0 +1,98 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+
+from hou_file_manager import sequences
+from hou_file_manager.fscache import DirListingCache
+
+
+def touch(dirname, *names):
+    for name in names:
+        open(os.path.join(str(dirname), name), 'w').close()
+
+
+def test_parse_frame_token():
+    assert sequences.parse_frame_token('img.$F4.exr') == ('img.', 4, '.exr')
+    assert sequences.parse_frame_token('img.${F3}.exr') == ('img.', 3, '.exr')
+    # No padding is the same as a padding of 1.
+    assert sequences.parse_frame_token('img.$F.exr') == ('img.', 1, '.exr')
+    assert sequences.parse_frame_token('img.$FPS.exr') is None
+    assert sequences.parse_frame_token('img.`$F`.exr') is None
+
+
+def test_frames_of_padding():
+    index = sequences.SequenceIndex(
+        ['img.0001.exr', 'img.0002.exr', 'img.01.exr', 'img.10000.exr',
+         'img.00100.exr'])
+
+    # Longer frames are included unless they are zero padded.
+    assert index.frames('img.', 4, '.exr') == [1, 2, 10000]
+    assert index.frames('img.', 2, '.exr') == [1, 10000]
+
+
+def test_negative_frames(tmp_path):
+    touch(tmp_path, 'img.-0002.exr', 'img.-0001.exr', 'img.0000.exr',
+          'img.0001.exr')
+
+    sequence = sequences.resolve_sequence(
+        str(tmp_path / 'img.$F4.exr'), str(tmp_path / 'img.-0002.exr'),
+        DirListingCache())
+
+    assert sequence.frames == [-2, -1, 0, 1]
+    assert sequence.missing_count() == 0
+    assert sequence.file_name(-2) == 'img.-0002.exr'
+    assert os.path.isfile(sequence.file_paths()[0])
+
+
+def test_hyphen_separator_is_not_negative(tmp_path):
+    touch(tmp_path, 'shot-0001.exr', 'shot-0002.exr')
+
+    sequence = sequences.resolve_sequence(
+        str(tmp_path / 'shot-$F4.exr'), str(tmp_path / 'shot-0001.exr'),
+        DirListingCache())
+
+    assert sequence.frames == [1, 2]
+
+
+def test_missing_frames(tmp_path):
+    touch(tmp_path, 'img.1.exr', 'img.2.exr', 'img.5.exr')
+
+    sequence = sequences.resolve_sequence(
+        str(tmp_path / 'img.$F.exr'), str(tmp_path / 'img.1.exr'),
+        DirListingCache())
+
+    assert sequence.frame_range() == (1, 5)
+    assert sequence.missing_frames() == [3, 4]
+    assert sequence.describe() == 'frames 1-5, 2 missing'
+
+
+def test_expanded_prefix(tmp_path):
+    touch(tmp_path, 'shot_a.0001.exr', 'shot_a.0002.exr')
+
+    # $HIPNAME is only known from the evaluated value.
+    sequence = sequences.resolve_sequence(
+        str(tmp_path / '$HIPNAME.$F4.exr'), str(tmp_path / 'shot_a.0001.exr'),
+        DirListingCache())
+
+    assert sequence.prefix == 'shot_a.'
+    assert sequence.frames == [1, 2]
@@ -0,0 +1,87 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+
+from hou_file_manager import tiles
+from hou_file_manager.fscache import DirListingCache
+
+
+def touch(dirname, *names):
+    for name in names:
+        open(os.path.join(str(dirname), name), 'w').close()
+
+
+def test_udim_uv_round_trip():
+    for udim in (1001, 1010, 1011, 1099):
+        assert tiles.uv_to_udim(*tiles.udim_to_uv(udim)) == udim
+
+    assert tiles.udim_to_uv(1011) == (0, 1)
+
+
+def test_udim(tmp_path):
+    touch(tmp_path, 'a.1000.exr', 'a.1001.exr', 'a.1012.exr', 'a.exr')
+
+    tile_set = tiles.resolve_tiles(str(tmp_path / 'a.<UDIM>.exr'),
+                                   DirListingCache())
+
+    # 1000 is not a UDIM.
+    assert tile_set.udims() == [1001, 1012]
+    assert tile_set.describe() == '2 tile(s) 1001-1012'
+
+
+def test_uvtile_is_one_based(tmp_path):
+    touch(tmp_path, 'a.u0_v0.exr', 'a.u1_v1.exr', 'a.u2_v1.exr',
+          'a.u1_v2.exr')
+
+    tile_set = tiles.resolve_tiles(str(tmp_path / 'a.<UVTILE>.exr'),
+                                   DirListingCache())
+
+    # u0_v0 doesn't exist in 1-based tiles, and gave a negative tile.
+    assert tile_set.udims() == [1001, 1002, 1011]
+    assert all(t.u >= 0 and t.v >= 0 for t in tile_set.tiles)
+
+
+def test_uv_is_zero_based(tmp_path):
+    touch(tmp_path, 'a_u0_v0.exr', 'a_u1_v0.exr', 'a_u0_v1.exr',
+          'a_u10_v0.exr')
+
+    tile_set = tiles.resolve_tiles(str(tmp_path / 'a_u<U>_v<V>.exr'),
+                                   DirListingCache())
+
+    # u10 would be the same UDIM as u0_v1.
+    assert tile_set.udims() == [1001, 1002, 1011]
+
+
+def test_repeated_token_must_match(tmp_path):
+    touch(tmp_path, 'a.1001.1001.exr', 'a.1001.1002.exr')
+
+    tile_set = tiles.resolve_tiles(str(tmp_path / 'a.<UDIM>.<UDIM>.exr'),
+                                   DirListingCache())
+
+    assert [t.name for t in tile_set.tiles] == ['a.1001.1001.exr']
+
+
+def test_tokens_in_directory():
+    assert tiles.resolve_tiles('/tex/<UDIM>/a.exr') is None
+    assert tiles.tile_glob_pattern('/tex/<UVTILE>/%(UDIM)d.exr') == \
+        '/tex/u[1-9]*_v[1-9]*/[1-9][0-9][0-9][0-9].exr'
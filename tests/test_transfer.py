@@ -0,0 +1,222 @@
+# MIT License
+#
+# Copyright: (C) 2024 Kevin Ma Yi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+
+from hou_file_manager import constants as const
+from hou_file_manager import transfer
+
+
+def write(path, data):
+    with open(str(path), 'w') as f:
+        f.write(data)
+
+
+def read(path):
+    with open(str(path)) as f:
+        return f.read()
+
+
+class Events:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, kind, s_file, target_file, size=0, message=''):
+        self.events.append((kind, message))
+
+    def last(self):
+        return self.events[-1]
+
+
+def run(s_file, file_action, dest_dir):
+    """ Transfer a file with the journal of the dest dir, like a batch."""
+
+    journal = transfer.TransferJournal(str(dest_dir))
+    emit = Events()
+    result = transfer.transfer_file(str(s_file), file_action, str(dest_dir),
+                                    journal, emit)
+    journal.flush()
+    return result, emit.last()
+
+
+def test_copy(tmp_path):
+    src, dest = tmp_path / 'src', tmp_path / 'dest'
+    src.mkdir()
+    dest.mkdir()
+    write(src / 'a.exr', 'a')
+
+    assert run(src / 'a.exr', const.FILE_ACTION_COPY, dest)[0]
+    assert read(dest / 'a.exr') == 'a'
+    assert (src / 'a.exr').exists()
+    assert (dest / const.TRANSFER_MANIFEST_NAME).exists()
+    assert not (dest / ('a.exr' + const.TRANSFER_PARTIAL_SUFFIX)).exists()
+
+    # Done by the previous run.
+    result, event = run(src / 'a.exr', const.FILE_ACTION_COPY, dest)
+    assert result
+    assert event[0] == const.TRANSFER_EVENT_SKIPPED
+
+
+def test_engine(tmp_path):
+    src, dest = tmp_path / 'src', tmp_path / 'dest'
+    src.mkdir()
+    dest.mkdir()
+    for name in ('a.exr', 'b.exr', 'c.exr'):
+        write(src / name, name)
+
+    plan = transfer.TransferPlan(str(dest))
+    plan.add_job([str(src / 'a.exr'), str(src / 'b.exr')])
+    plan.add_job([str(src / 'c.exr')])
+    plan.add_job([str(src / 'missing.exr')])
+
+    engine = transfer.TransferEngine(const.FILE_ACTION_COPY, str(dest),
+                                     max_workers=2)
+    progress = transfer.TransferProgress()
+    for events in engine.run_iter(plan):
+        progress.update(events)
+
+    assert engine.results == [True, True, False]
+    assert sorted(os.listdir(str(dest))) == \
+        [const.TRANSFER_MANIFEST_NAME, 'a.exr', 'b.exr', 'c.exr']
+
+
+
+def test_plan_collisions(tmp_path):
+    plan = transfer.TransferPlan(str(tmp_path))
+    plan.add_job(['/a/tex.1001.exr', '/a/tex.1002.exr'])
+    plan.add_job(['/a/tex.1001.exr'])
+    plan.add_job(['/b/tex.1002.exr'])
+
+    assert len(plan.transfers()) == 1
+    assert len(plan.collisions()) == 1
+    assert plan.file_count() == 4
+
+
+def test_resume_move(tmp_path):
+    src, dest = tmp_path / 'src', tmp_path / 'dest'
+    src.mkdir()
+    dest.mkdir()
+    write(src / 'a.exr', 'a')
+
+    assert run(src / 'a.exr', const.FILE_ACTION_MOVE, dest)[0]
+    assert not (src / 'a.exr').exists()
+
+    # The rerun of an interrupted batch, the source is gone.
+    result, event = run(src / 'a.exr', const.FILE_ACTION_MOVE, dest)
+    assert result
+    assert event == (const.TRANSFER_EVENT_SKIPPED, 'Already transferred.')
+
+
+def test_basename_collision_across_batches(tmp_path):
+    src_a, src_b, dest = tmp_path / 'a', tmp_path / 'b', tmp_path / 'dest'
+    for d in (src_a, src_b, dest):
+        d.mkdir()
+    write(src_a / 'tex.exr', 'a')
+    write(src_b / 'tex.exr', 'b')
+
+    assert run(src_a / 'tex.exr', const.FILE_ACTION_COPY, dest)[0]
+
+    # Another file with the same name must not be taken as transferred,
+    # nor overwrite the one of the previous batch.
+    result, event = run(src_b / 'tex.exr', const.FILE_ACTION_COPY, dest)
+    assert not result
+    assert event[0] == const.TRANSFER_EVENT_FAILED
+    assert read(dest / 'tex.exr') == 'a'
+
+
+def test_changed_target_is_not_removed(tmp_path):
+    src, dest = tmp_path / 'src', tmp_path / 'dest'
+    src.mkdir()
+    dest.mkdir()
+    write(src / 'a.exr', 'a')
+
+    assert run(src / 'a.exr', const.FILE_ACTION_COPY, dest)[0]
+    write(dest / 'a.exr', 'changed by the user')
+
+    result, event = run(src / 'a.exr', const.FILE_ACTION_COPY, dest)
+    assert not result
+    assert 'changed since it was transferred' in event[1]
+    assert read(dest / 'a.exr') == 'changed by the user'
+
+
+def test_changed_source_is_transferred_again(tmp_path):
+    src, dest = tmp_path / 'src', tmp_path / 'dest'
+    src.mkdir()
+    dest.mkdir()
+    write(src / 'a.exr', 'a')
+
+    assert run(src / 'a.exr', const.FILE_ACTION_COPY, dest)[0]
+    write(src / 'a.exr', 'a new version')
+    os.utime(str(src / 'a.exr'), ns=(1000000000, 1000000000))
+
+    result, event = run(src / 'a.exr', const.FILE_ACTION_COPY, dest)
+    assert result
+    assert event[0] == const.TRANSFER_EVENT_DONE
+    assert read(dest / 'a.exr') == 'a new version'
+
+
+def test_missing_source(tmp_path):
+    result, event = run(tmp_path / 'missing.exr', const.FILE_ACTION_COPY,
+                        tmp_path)
+    assert not result
+    assert event == (const.TRANSFER_EVENT_FAILED,
+                     'The source file does not exist.')
+
+
+def test_move_stopped_before_recorded(tmp_path):
+    src, dest = tmp_path / 'src', tmp_path / 'dest'
+    src.mkdir()
+    dest.mkdir()
+    write(src / 'a.exr', 'a')
+
+    assert run(src / 'a.exr', const.FILE_ACTION_MOVE, dest)[0]
+
+    # Like a batch which stopped between the rename and the journal.
+    os.remove(str(dest / const.TRANSFER_MANIFEST_NAME))
+
+    result, event = run(src / 'a.exr', const.FILE_ACTION_MOVE, dest)
+    assert result
+    assert event[0] == const.TRANSFER_EVENT_SKIPPED
+    assert read(dest / 'a.exr') == 'a'
+
+
+def test_failed_transfer_keeps_the_previous_copy(tmp_path, monkeypatch):
+    src, dest = tmp_path / 'src', tmp_path / 'dest'
+    src.mkdir()
+    dest.mkdir()
+    write(src / 'a.exr', 'a')
+
+    assert run(src / 'a.exr', const.FILE_ACTION_COPY, dest)[0]
+    write(src / 'a.exr', 'a new version')
+    os.utime(str(src / 'a.exr'), ns=(1000000000, 1000000000))
+
+    def fail(*args):
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(transfer, 'reflink_file', fail)
+    monkeypatch.setattr(transfer, '_copy_data', fail)
+
+    result, event = run(src / 'a.exr', const.FILE_ACTION_COPY, dest)
+    assert not result
+    assert event[0] == const.TRANSFER_EVENT_FAILED
+    assert read(dest / 'a.exr') == 'a'
+    assert not (dest / ('a.exr' + const.TRANSFER_PARTIAL_SUFFIX)).exists()